@@ -0,0 +1,151 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Generates the daily questions report of many log files in parallel.
+
+    python batch_reports.py logs/ --out reports/ [--days 20] [--months 3] [--workers 8]
+    python batch_reports.py manifest.txt --out reports/
+
+The input is either a directory, whose *.txt files are the logs, or a manifest file listing one
+log path per line (relative paths are relative to the manifest, lines starting with # are ignored).
+Each log is rendered to <out>/<log name>.html by a worker process. A failing log does not stop the
+others; every log's timing and error is written to <out>/batch_summary.json.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from daily_questions import DailyQuestions
+
+def read_manifest(path):
+    """
+    Returns the log files listed in a manifest, one per line
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path) as manifest:
+        lines = [line.strip() for line in manifest]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+def find_logs(source):
+    """
+    Returns the log files of a directory, or those listed in a manifest file
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.txt')))
+    return read_manifest(source)
+
+def get_report_paths(log_files, out_dir):
+    """
+    Maps each log file to <out_dir>/<log name>.html, numbering logs that share a name
+    with the first number no other log uses, as a log may itself be named like a numbered one
+    """
+    report_paths = []
+    used = set()
+    last_number = {}
+    for log_file in log_files:
+        base = os.path.splitext(os.path.basename(log_file))[0]
+        name = base
+        while name in used:
+            last_number[base] = last_number.get(base, 1) + 1
+            name = '{}-{}'.format(base, last_number[base])
+        used.add(name)
+        report_paths.append(os.path.join(out_dir, name + '.html'))
+    return report_paths
+
+def new_result(log_file, report_path):
+    return {'log_file': log_file, 'report': report_path, 'rows_read': 0, 'rows_inserted': 0,
+            'load_seconds': 0.0, 'render_seconds': 0.0, 'error': None}
+
+def generate_report(log_file, report_path, options, db_dir=None):
+    """
+    Loads one log and writes its report. Runs in a worker process, so errors are caught and returned.
+    returns a dict with the row counts, load and render seconds and the error if any
+    """
+    result = new_result(log_file, report_path)
+    try:
+        start = time.perf_counter()
+        if db_dir is not None:
+            options = dict(options, db_path=os.path.join(db_dir, os.path.basename(report_path)[:-5] + '.db'))
+        #A Path, as a str is taken for log text unless it ends in .txt
+        dq = DailyQuestions(Path(log_file), **options)
+        result['rows_read'], result['rows_inserted'] = dq.loadContent()
+        result['load_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        #Write to a temporary file first so a failed render never leaves half a report behind
+        with open(report_path + '.tmp', 'w') as report:
+            dq.write_report(report)
+        os.replace(report_path + '.tmp', report_path)
+        result['render_seconds'] = time.perf_counter() - start
+    except Exception:
+        result['error'] = traceback.format_exc()
+    return result
+
+def run_batch(log_files, out_dir, workers=None, db_dir=None, **options):
+    """
+    Generates the reports of log_files into out_dir across a pool of worker processes.
+    Options are passed on to DailyQuestions. With db_dir, each log keeps a persistent store there
+    so later runs only parse newly appended lines.
+    returns the per log results in the order of log_files
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if db_dir is not None:
+        os.makedirs(db_dir, exist_ok=True)
+    report_paths = get_report_paths(log_files, out_dir)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for log_file, report_path in zip(log_files, report_paths):
+            try:
+                futures.append(executor.submit(generate_report, log_file, report_path, options, db_dir))
+            except Exception as e:
+                futures.append(Future())
+                futures[-1].set_exception(e)
+        #A worker killed by a signal or the OOM killer breaks the pool, failing every log not yet done.
+        #Those are recorded like any other failed log so the summary is still written.
+        for future, log_file, report_path in zip(futures, log_files, report_paths):
+            try:
+                results.append(future.result())
+            except Exception:
+                result = new_result(log_file, report_path)
+                result['error'] = traceback.format_exc()
+                results.append(result)
+
+    with open(os.path.join(out_dir, 'batch_summary.json'), 'w') as summary:
+        json.dump(results, summary, indent=2)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='directory of *.txt logs or a manifest file listing log paths')
+    parser.add_argument('--out', required=True, help='directory the reports are written to')
+    parser.add_argument('--days', type=int, default=10, help='number of days in the day view')
+    parser.add_argument('--months', type=int, default=2, help='number of months in the month view')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, defaults to the cpu count')
+    parser.add_argument('--db-dir', default=None, help='directory of persistent stores for incremental loads')
+    parser.add_argument('--print-only-decimals', action='store_true')
+    parser.add_argument('--censor-questions', action='store_true')
+    args = parser.parse_args(argv)
+
+    log_files = find_logs(args.source)
+    start = time.perf_counter()
+    results = run_batch(log_files, args.out, workers=args.workers, db_dir=args.db_dir,
+                        n_days=args.days, n_months=args.months,
+                        print_only_decimals=args.print_only_decimals,
+                        censor_questions=args.censor_questions)
+    failed = [result for result in results if result['error']]
+    for result in failed:
+        print('{} failed:\n{}'.format(result['log_file'], result['error']), file=sys.stderr)
+    print('{} reports, {} failed in {:.2f}s'.format(len(results), len(failed), time.perf_counter() - start))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
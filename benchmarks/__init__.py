@@ -0,0 +1,3 @@
+"""
+Benchmarks for daily_questions. Run each module with python -m benchmarks.<name> from the repo root.
+"""
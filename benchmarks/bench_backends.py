@@ -0,0 +1,69 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Compares the sqlite and numpy backends: load time, row store memory and query times.
+
+    python -m benchmarks.bench_backends [--lines 100000 1000000] [--questions 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+#Imported up front so the first numpy load does not pay for it
+import numpy
+
+from daily_questions import DailyQuestions
+from benchmarks.synthetic import write_log
+
+QUERIES = ('_get_last_n_days', '_get_last_n_months', '_score_by_day', '_score_by_question')
+
+def store_bytes(dq):
+    """
+    Bytes held by the row store: the sqlite pages, or the NumPy arrays and interned questions
+    """
+    if dq._columns is not None:
+        return dq._columns.nbytes() + sum(len(question) for question in dq._columns.questions)
+    page_count = dq._cur.execute("PRAGMA page_count").fetchone()[0]
+    page_size = dq._cur.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+def bench(path, backend, repeat):
+    tracemalloc.start()
+    start = time.perf_counter()
+    dq = DailyQuestions(path, n_days=30, n_months=12, backend=backend)
+    dq.loadContent()
+    load = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(getattr(dq, query)())
+        timings.append((time.perf_counter() - start) / repeat)
+    return load, store_bytes(dq), peak, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--questions', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print('{:>9} {:>7} {:>8} {:>12} {:>12} '.format('lines', 'backend', 'load s', 'store bytes', 'peak bytes') +
+          ' '.join('{:>20}'.format(query.lstrip('_')) for query in QUERIES))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_lines in args.lines:
+            path = write_log(os.path.join(tmp, 'log.txt'), n_lines, args.questions)
+            for backend in ('sqlite', 'numpy'):
+                load, size, peak, timings = bench(path, backend, args.repeat)
+                print('{:>9} {:>7} {:>8.3f} {:>12,} {:>12,} '.format(n_lines, backend, load, size, peak) +
+                      ' '.join('{:>20.5f}'.format(timing) for timing in timings))
+
+if __name__ == '__main__':
+    main()
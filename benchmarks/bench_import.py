@@ -0,0 +1,46 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Compares the start-up time of the headless report path against the imports daily_questions used
+to make at module level (pandas, numpy, matplotlib and requests).
+
+    python -m benchmarks.bench_import [--runs 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    ('python only', 'pass'),
+    ('import daily_questions', 'import daily_questions'),
+    ('previous module imports', 'import requests, pandas, numpy, matplotlib.pyplot, matplotlib.dates, '+
+                                'matplotlib.cbook, dateutil.relativedelta'),
+]
+
+def time_statement(statement, runs, cwd):
+    """
+    Best wall time of running statement in a fresh interpreter
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', statement], cwd=cwd)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for label, statement in STATEMENTS:
+        print('{:24} {:8.3f}s'.format(label, time_statement(statement, args.runs, repo)))
+
+if __name__ == '__main__':
+    main()
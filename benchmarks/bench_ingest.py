@@ -0,0 +1,106 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Compares rows/second of DailyQuestions.loadContent against the original row by row loader.
+Rates are log lines per second of wall time, so lines skipped by seeking count as processed.
+
+    python -m benchmarks.bench_ingest [--lines 1000000]
+
+It first checks that seeking to the cut date loses no rows of out-of-order logs, by loading
+synthetic logs with late lines both from a file and as text, which is always parsed in full.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+
+from daily_questions import DailyQuestions
+from benchmarks.synthetic import synthetic_lines, write_log
+
+def legacy_load(path, cut_date):
+    """
+    The original _loadFromFile: strptime plus strftime calls and one INSERT per row into the original schema
+    """
+    con = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    cur = con.cursor()
+    cur.execute("CREATE TABLE daily_question (date DATE, month INTEGER, day INTEGER, "+
+                "year INTEGER, question, score INTEGER)")
+    with open(path, "r") as txtfile:
+        reader = csv.reader(txtfile, delimiter='|', quotechar='"')
+        row_count = 0
+        insert_count = 0
+        for row in reader:
+            if len(row) == 3:
+                dateTime = time.strptime(row[0], '%Y/%m/%d')
+                sdate = time.strftime("%Y-%m-%d", dateTime)
+                month = int(time.strftime('%m', dateTime))
+                day = int(time.strftime('%d', dateTime))
+                year = int(time.strftime('%Y', dateTime))
+                question = row[1].strip()
+                score = row[2]
+                if date(year, month, day) >= cut_date:
+                    cur.execute("INSERT INTO daily_question VALUES (?, ?, ?, ?, ?, ?)",
+                                (sdate, month, day, year, question, score))
+                    insert_count += 1
+                row_count += 1
+    con.commit()
+    return row_count, insert_count
+
+def batched_load(path, cut_date):
+    dq = DailyQuestions(path, n_days=365, n_months=12)
+    dq._cut_date = cut_date
+    return dq._loadFromFile()
+
+def time_loader(loader, path):
+    cut_date = DailyQuestions(path, n_days=365, n_months=12)._get_month_cut_date()
+    start = time.perf_counter()
+    row_count, insert_count = loader(path, cut_date)
+    return row_count, insert_count, time.perf_counter() - start
+
+def check_disorder(tmp, seeds=30, disorder_rate=0.05):
+    """
+    returns the seeds whose out-of-order log inserts other rows loaded from a file than from text
+    """
+    failed = []
+    path = os.path.join(tmp, 'disorder.txt')
+    for seed in range(seeds):
+        lines = list(synthetic_lines(3000, 10, seed=seed, disorder_rate=disorder_rate))
+        with open(path, 'w') as txtfile:
+            txtfile.writelines(lines)
+        from_file = DailyQuestions(path, n_months=2).loadContent()
+        from_text = DailyQuestions(''.join(lines), n_months=2).loadContent()
+        if from_file[1] != from_text[1]:
+            failed.append(seed)
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1000000)
+    args = parser.parse_args()
+
+    #Long history where the cut date discards most rows, and a wide recent window where all rows are kept
+    scenarios = [('long history, 10 questions', 10), ('last year, {} questions'.format(args.lines // 330),
+                                                      args.lines // 330)]
+    with tempfile.TemporaryDirectory() as tmp:
+        failed = check_disorder(tmp)
+        if failed:
+            print('out-of-order logs lost rows with seeds {}'.format(failed))
+            return 1
+        print('out-of-order logs: no rows lost')
+
+        for name, n_questions in scenarios:
+            path = write_log(os.path.join(tmp, 'log.txt'), args.lines, n_questions)
+            print('{} ({} lines)'.format(name, args.lines))
+            for label, loader in [('legacy', legacy_load), ('batched', batched_load)]:
+                row_count, insert_count, elapsed = time_loader(loader, path)
+                print('  {:8} {:>9} rows read {:>9} inserted {:8.2f}s {:>12,.0f} rows/s'.format(
+                      label, row_count, insert_count, elapsed, args.lines / elapsed))
+
+if __name__ == '__main__':
+    sys.exit(main())
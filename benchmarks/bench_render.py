@@ -0,0 +1,44 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Measures report size against render time for day views up to a year long.
+
+    python -m benchmarks.bench_render [--questions 50 300] [--days 30 90 180 365]
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from daily_questions import DailyQuestions
+from benchmarks.synthetic import write_log
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--questions', type=int, nargs='+', default=[50, 300])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 90, 180, 365])
+    args = parser.parse_args()
+
+    print('{:>9} {:>5} {:>12} {:>10} {:>10}'.format('questions', 'days', 'report chars', 'join s', 'stream s'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_questions in args.questions:
+            path = write_log(os.path.join(tmp, 'log.txt'), 366 * n_questions, n_questions)
+            for n_days in args.days:
+                dq = DailyQuestions(path, n_days=n_days, n_months=12)
+                dq.loadContent()
+
+                start = time.perf_counter()
+                report = dq.table_last_n_days() + dq.table_last_n_months() + dq.get_statistics()
+                joined = time.perf_counter() - start
+
+                start = time.perf_counter()
+                dq.write_report(io.StringIO())
+                streamed = time.perf_counter() - start
+                print('{:>9} {:>5} {:>12,} {:>10.4f} {:>10.4f}'.format(n_questions, n_days, len(report),
+                                                                      joined, streamed))
+
+if __name__ == '__main__':
+    main()
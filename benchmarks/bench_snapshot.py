@@ -0,0 +1,53 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Measures start-up from a snapshot against parsing the log, after a day of lines is appended.
+The snapshot holds the whole history while a parse skips to the last twelve months.
+
+    python -m benchmarks.bench_snapshot [--lines 1000000] [--questions 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+#Imported up front so the first numpy load does not pay for it
+import numpy
+
+from daily_questions import DailyQuestions
+from benchmarks.synthetic import synthetic_lines
+
+def timed_load(path, **options):
+    start = time.perf_counter()
+    dq = DailyQuestions(path, n_months=12, backend='numpy', **options)
+    rows = dq.loadContent()
+    dq.get_statistics()
+    return time.perf_counter() - start, rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--questions', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'log.txt')
+        snapshot_dir = os.path.join(tmp, 'snapshot')
+        lines = list(synthetic_lines(args.lines + args.questions, args.questions))
+        with open(path, 'w') as txtfile:
+            txtfile.writelines(lines[:args.lines])
+
+        print('{:<20} {:>10} {:>12}'.format('load', 'seconds', 'rows parsed'))
+        seconds, rows = timed_load(path, snapshot_dir=snapshot_dir)
+        print('{:<20} {:>10.3f} {:>12,}'.format('snapshot (cold)', seconds, rows[0]))
+        with open(path, 'a') as txtfile:
+            txtfile.writelines(lines[args.lines:])
+        seconds, rows = timed_load(path, snapshot_dir=snapshot_dir)
+        print('{:<20} {:>10.3f} {:>12,}'.format('snapshot + tail', seconds, rows[0]))
+        seconds, rows = timed_load(path)
+        print('{:<20} {:>10.3f} {:>12,}'.format('parse 12 months', seconds, rows[0]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Load tests a running report_server.py and prints p50/p99 latency and requests/second.
+
+    python report_server.py stores/ &
+    python -m benchmarks.load_test http://127.0.0.1:8000/user1/report?days=30 [--requests 1000] [--concurrency 50]
+
+Several URLs are requested round robin.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+async def fetch(url):
+    """
+    GETs url and returns its status code
+    """
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    target = parts.path + ('?' + parts.query if parts.query else '')
+    writer.write('GET {} HTTP/1.1\r\nHost: {}\r\nConnection: close\r\n\r\n'.format(target, parts.netloc).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+async def worker(urls, counter, n_requests, latencies, errors):
+    while True:
+        i = counter[0]
+        if i >= n_requests:
+            return
+        counter[0] += 1
+        start = time.perf_counter()
+        try:
+            status = await fetch(urls[i % len(urls)])
+        except OSError:
+            status = None
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+
+async def run(urls, n_requests, concurrency, latencies, errors):
+    #Shared count of requests started, so the workers stop after n_requests in total
+    counter = [0]
+    await asyncio.gather(*[worker(urls, counter, n_requests, latencies, errors) for _ in range(concurrency)])
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    latencies = []
+    errors = []
+    loop = asyncio.new_event_loop()
+    start = time.perf_counter()
+    loop.run_until_complete(run(args.urls, args.requests, args.concurrency, latencies, errors))
+    elapsed = time.perf_counter() - start
+    loop.close()
+
+    print('{} requests, {} errors, concurrency {}'.format(len(latencies), len(errors), args.concurrency))
+    print('p50 {:.1f} ms  p99 {:.1f} ms  {:.1f} requests/s'.format(percentile(latencies, 0.5) * 1000,
+                                                                   percentile(latencies, 0.99) * 1000,
+                                                                   len(latencies) / elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Times loading, the three report tables and the chart over synthetic logs of several sizes and writes JSON.
+
+    python -m benchmarks.suite [--years 1 5 20] [--questions 10 50] [--backends sqlite numpy]
+                               [--score-step 0.25] [--gap-rate 0.1] [--disorder-rate 0.01]
+                               [--out results.json] [--compare baseline.json]
+
+Each operation runs --repeat times on a fresh load, with the render cache off, and its min and median
+seconds are kept. The JSON also records the git revision, Python and library versions, so results of
+different versions can be compared with --compare, which prints the median ratio of every shared case.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from daily_questions import DailyQuestions
+from benchmarks.synthetic import write_log
+
+OPERATIONS = ('loadContent', 'table_last_n_days', 'table_last_n_months', 'get_statistics',
+              'display_last_n_months_line_chart')
+
+def get_versions():
+    versions = {'python': platform.python_version(), 'platform': platform.platform()}
+    for module in ('numpy', 'pandas', 'matplotlib'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    try:
+        versions['revision'] = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        versions['revision'] = None
+    return versions
+
+def time_operation(path, operation, repeat, **options):
+    """
+    returns the seconds of each run of operation, loading the log afresh before every run
+    """
+    runs = []
+    for _ in range(repeat):
+        dq = DailyQuestions(path, cache_size=0, **options)
+        if operation == 'loadContent':
+            start = time.perf_counter()
+            dq.loadContent()
+            runs.append(time.perf_counter() - start)
+            continue
+
+        dq.loadContent()
+        start = time.perf_counter()
+        getattr(dq, operation)()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def run_suite(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for years in args.years:
+            for n_questions in args.questions:
+                path = write_log(os.path.join(tmp, 'log.txt'), int(years * 365 * (1 - args.gap_rate)) * n_questions,
+                                 n_questions, seed=args.seed, score_step=args.score_step,
+                                 gap_rate=args.gap_rate, disorder_rate=args.disorder_rate)
+                log_bytes = os.path.getsize(path)
+                for backend in args.backends:
+                    for operation in args.operations:
+                        case = {'years': years, 'questions': n_questions, 'backend': backend,
+                                'operation': operation, 'log_bytes': log_bytes}
+                        try:
+                            runs = time_operation(path, operation, args.repeat, backend=backend,
+                                                  n_days=args.days, n_months=args.months)
+                            case.update(runs=runs, min=min(runs), median=statistics.median(runs), error=None)
+                        except ImportError as e:
+                            case.update(runs=[], min=None, median=None, error=str(e))
+                        results.append(case)
+                        print('{:>5} {:>9} {:>7} {:<34} {}'.format(
+                            years, n_questions, backend, operation,
+                            case['error'] or '{:.4f}s'.format(case['median'])), file=sys.stderr)
+    return results
+
+def compare(results, baseline):
+    """
+    Prints the median time of every case also in baseline relative to it, on stderr like the progress lines
+    """
+    def key(case):
+        return case['years'], case['questions'], case['backend'], case['operation']
+    medians = dict((key(case), case['median']) for case in baseline['results'])
+    print('{:>5} {:>9} {:>7} {:<34} {:>8}'.format('years', 'questions', 'backend', 'operation', 'ratio'),
+          file=sys.stderr)
+    for case in results:
+        before = medians.get(key(case))
+        if before and case['median'] is not None:
+            print('{:>5} {:>9} {:>7} {:<34} {:>8.2f}'.format(*key(case), case['median'] / before), file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 50])
+    parser.add_argument('--backends', nargs='+', choices=('sqlite', 'numpy'), default=['sqlite', 'numpy'])
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument('--score-step', type=float, default=1, help='scores are multiples of this between 0 and 1')
+    parser.add_argument('--gap-rate', type=float, default=0.0, help='fraction of days not logged')
+    parser.add_argument('--disorder-rate', type=float, default=0.0, help='fraction of lines written late')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help='file the JSON results are written to, stdout by default')
+    parser.add_argument('--compare', default=None, help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    #Import matplotlib up front so the first chart timed does not pay for it
+    try:
+        import report_charts
+    except ImportError:
+        pass
+    started = datetime.now().isoformat()
+    results = run_suite(args)
+    report = {'started': started, 'versions': get_versions(), 'settings': vars(args), 'results': results}
+    if args.out is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.out, 'w') as out:
+            json.dump(report, out, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as baseline:
+            compare(results, json.load(baseline))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+import heapq
+import random
+from datetime import date, timedelta
+
+QUESTIONS = ["be fully engaged", "set clear goals", "make progress toward goals", "be happy",
+             "find meaning", "build positive relationships", "exercise", "read", "sleep well",
+             "eat well"]
+
+def _format_score(score):
+    return '{:g}'.format(score)
+
+def synthetic_lines(n_lines, n_questions=10, end_date=None, seed=0, score_step=1, gap_rate=0.0,
+                    disorder_rate=0.0):
+    """
+    Yields n_lines of YYYY/MM/DD|question|score log lines, n_questions per day,
+    ending the day before end_date (default today) in date order.
+        score_step - scores are multiples of score_step between 0 and 1, e.g. 0.25 for quarter scores
+        gap_rate - fraction of days with no lines, as when a day is not logged
+        disorder_rate - fraction of lines written late, up to a few days after their date
+    """
+    rng = random.Random(seed)
+    questions = [QUESTIONS[i] if i < len(QUESTIONS) else 'question {}'.format(i) for i in range(n_questions)]
+    end_date = end_date or date.today()
+    n_days = -(-n_lines // n_questions)
+    #Start further back so the lines still end near end_date once days are skipped
+    day = end_date - timedelta(days=int(n_days / (1 - gap_rate)))
+    steps = int(round(1 / score_step))
+    delayed = []
+    written = 0
+    while written < n_lines:
+        if gap_rate and rng.random() < gap_rate:
+            day += timedelta(days=1)
+            continue
+        sdate = day.strftime('%Y/%m/%d')
+        for question in questions[:n_lines - written]:
+            line = '{}|{}|{}\n'.format(sdate, question, _format_score(rng.randint(0, steps) * score_step))
+            if disorder_rate and rng.random() < disorder_rate:
+                heapq.heappush(delayed, (written + rng.randint(1, 3 * n_questions), written, line))
+            else:
+                yield line
+            written += 1
+            while delayed and delayed[0][0] <= written:
+                yield heapq.heappop(delayed)[2]
+        day += timedelta(days=1)
+    while delayed:
+        yield heapq.heappop(delayed)[2]
+
+def write_log(path, n_lines, n_questions=10, end_date=None, seed=0, **shape):
+    """
+    Writes a synthetic log to path and returns path, shape takes the score_step, gap_rate
+    and disorder_rate of synthetic_lines
+    """
+    with open(path, 'w') as txtfile:
+        txtfile.writelines(synthetic_lines(n_lines, n_questions, end_date, seed, **shape))
+    return path
@@ -4,23 +4,60 @@
 #
 # Created on 2018-5-11
 #
+#pandas, numpy and matplotlib are only imported by display_last_n_months_line_chart,
+#so producing HTML reports (e.g. python -m daily_questions report) does not pay for them.
+import argparse
 import csv
+import os
+import sys
 import time
-import re
+import hashlib
+import json
+import mmap
 import calendar
 import sqlite3
-import unicodedata
-import string
-import requests
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import matplotlib.cbook as cbook
+import tempfile
 from math import ceil
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from functools import lru_cache, wraps
+from itertools import accumulate
+from pathlib import Path
+from urllib.request import pathname2url
+
+#Number of rows sent to sqlite per executemany call
+INSERT_BATCH_SIZE = 10000
+
+#Days before the cut date walked back over after the binary search, see _skip_to_cut_date
+DISORDER_SLACK_DAYS = 7
+
+#Day ordinal of 1970-01-01, the epoch of NumPy's datetime64
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+#Bumped whenever the tables below change, an on-disk store with another version is rebuilt
+SCHEMA_VERSION = 3
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS question (id INTEGER PRIMARY KEY, text TEXT UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS daily_question (date DATE, month INTEGER, day INTEGER, year INTEGER, "+
+    "question_id INTEGER REFERENCES question (id), score INTEGER)",
+    "CREATE INDEX IF NOT EXISTS daily_question_date ON daily_question (date)",
+    "CREATE INDEX IF NOT EXISTS daily_question_question_date ON daily_question (question_id, date)",
+    #Rollups updated after every insert batch so reports read O(days) rows instead of O(rows).
+    #Statistics windows start on the first of a month, so question and weekday rollups are kept per month.
+    "CREATE TABLE IF NOT EXISTS daily_rollup (date DATE PRIMARY KEY, year INTEGER, month INTEGER, "+
+    "day INTEGER, score_sum INTEGER, row_count INTEGER, q_count INTEGER)",
+    "CREATE TABLE IF NOT EXISTS question_rollup (question_id INTEGER, year INTEGER, month INTEGER, "+
+    "score_sum INTEGER, row_count INTEGER, PRIMARY KEY (question_id, year, month))",
+    "CREATE TABLE IF NOT EXISTS weekday_rollup (weekday INTEGER, year INTEGER, month INTEGER, "+
+    "score_sum INTEGER, row_count INTEGER, PRIMARY KEY (weekday, year, month))",
+    #Where the last load of each source file started and stopped, used to resume on the next load
+    "CREATE TABLE IF NOT EXISTS load_state (source TEXT PRIMARY KEY, start INTEGER, offset INTEGER, "+
+    "size INTEGER, mtime REAL, window_hash TEXT, cut_date DATE, censored INTEGER)",
+]
+
+#Every table a store has had in any SCHEMA_VERSION, dropped when the schema changes
+STORE_TABLES = ('question', 'daily_question', 'daily_rollup', 'question_rollup', 'weekday_rollup', 'load_state')
 
 #Helper Classes
 class DefaultListOrderedDict(OrderedDict):
@@ -28,6 +65,11 @@ class DefaultListOrderedDict(OrderedDict):
         self[k] = []
         return self[k]
 
+class DefaultDictOrderedDict(OrderedDict):
+    def __missing__(self,k):
+        self[k] = {}
+        return self[k]
+
 class DefaultIntOrderedDict(OrderedDict):
     def __missing__(self,k):
         self[k] = 0
@@ -43,6 +85,531 @@ def week_of_month(date):
 
     return int(ceil(adjusted_date/7.0))
 
+@lru_cache(maxsize=4096)
+def _parse_log_date(value):
+    """
+    Returns the iso date, month, day and year of a YYYY/MM/DD log date.
+    Cached since every question answered on a day repeats the same date string.
+    """
+    dateTime = time.strptime(value, '%Y/%m/%d')
+    return time.strftime("%Y-%m-%d", dateTime), dateTime.tm_mon, dateTime.tm_mday, dateTime.tm_year
+
+def _iter_lines(content):
+    """
+    Yields the lines of a string without splitting it up front, or of any iterable of str or bytes lines
+    """
+    if isinstance(content, str):
+        start = 0
+        while start < len(content):
+            end = content.find('\n', start)
+            if end == -1:
+                end = len(content)
+            yield content[start:end]
+            start = end + 1
+    else:
+        for line in content:
+            yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+def _line_date(line):
+    """
+    Returns the iso date of a log line's leading YYYY/MM/DD field, or None if it has none
+    """
+    try:
+        return _parse_log_date(line.split(b'|', 1)[0].decode('utf-8'))[0]
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _find_cut_offset(buf, cut_date):
+    """
+    Binary search over the lines of a date ordered log for the offset of the first line
+    dated on or after cut_date (iso string). Lines without a date are stepped over.
+    """
+    lo, hi = 0, len(buf)
+    #Invariant: lines starting before lo are older than cut_date, lines starting at hi or later are not
+    while lo < hi:
+        line_start = buf.rfind(b'\n', lo, (lo + hi) // 2) + 1 or lo
+        line_date = None
+        probe = line_start
+        while line_date is None and probe < hi:
+            line_end = buf.find(b'\n', probe, hi)
+            line_end = hi if line_end == -1 else line_end
+            line_date = _line_date(buf[probe:line_end])
+            if line_date is None:
+                probe = line_end + 1
+        if line_date is None or line_date >= cut_date:
+            hi = line_start
+        else:
+            lo = line_end + 1
+    return lo
+
+def _has_lines_since(buf, offset, cut_date, floor_date, max_bytes=1 << 20):
+    """
+    Walks the lines before offset back to the first one dated before floor_date, or at most max_bytes.
+    The binary search assumes date order, so if a late line was probed, lines dated on or after cut_date
+    can sit before the offset it found.
+    returns True if any line walked over is dated on or after cut_date (iso strings)
+    """
+    end = offset
+    stop = max(0, offset - max_bytes)
+    while end > stop:
+        newline = buf.rfind(b'\n', stop, end - 1)
+        start = newline + 1 if newline != -1 else stop
+        line_date = _line_date(buf[start:end])
+        if line_date is not None:
+            if line_date >= cut_date:
+                return True
+            if line_date < floor_date:
+                return False
+        end = start
+    return False
+
+@lru_cache(maxsize=1024)
+def _censor_question(question):
+    return ''.join([ '*' if i%3 == 0 else ch for i, ch in enumerate(question)])
+
+@lru_cache(maxsize=4096)
+def _iso_to_ordinal(sdate):
+    return date(int(sdate[:4]), int(sdate[5:7]), int(sdate[8:10])).toordinal()
+
+@lru_cache(maxsize=1024)
+def _to_score(value):
+    """
+    Numeric value of a score field, 0 for text like sqlite's SUM and AVG
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+def _to_number(value):
+    """
+    Converts a NumPy score to int when it is whole, the way sqlite's INTEGER columns keep scores and their sums
+    """
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+def _score_value(score):
+    """
+    The number a score is summed as in sqlite, where INTEGER affinity stores numeric text as a number
+    and SUM counts any other text as 0
+    """
+    try:
+        return _to_number(score)
+    except ValueError:
+        return 0
+
+class ColumnarStore:
+    """
+    Daily question rows held as NumPy arrays, the backend='numpy' alternative to the sqlite tables:
+    an int32 day ordinal, int16 question id and float32 score per row, with question text interned once.
+    Scores are read back as the float64 of their shortest float32 repr, so a logged 0.3 is summed and
+    printed as sqlite's 0.3. Scores needing more than float32's 7 significant digits are rounded.
+    """
+    SNAPSHOT_VERSION = 2
+    SNAPSHOT_COLUMNS = (('_days', 'days.int32'), ('_question_ids', 'question_ids.int16'),
+                        ('_scores', 'scores.float32'))
+
+    def __init__(self):
+        import numpy as np
+        self._np = np
+        self.questions = []
+        self.question_ids = {}
+        self.size = 0
+        self._directory = None
+        self._days = np.empty(1024, np.int32)
+        self._question_ids = np.empty(1024, np.int16)
+        self._scores = np.empty(1024, np.float32)
+
+    def attach(self, directory):
+        """
+        Backs the store with a snapshot directory holding one raw file per column and snapshot.json.
+        The columns are memory mapped rather than read and appended rows are written straight to the files,
+        so reopening a snapshot costs neither parsing nor copying. Rows appended after the last commit are dropped.
+        returns the load state saved by commit, or None for a new snapshot
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        try:
+            with open(os.path.join(directory, 'snapshot.json')) as fp:
+                meta = json.load(fp)
+        except FileNotFoundError:
+            meta = {}
+        size = meta.get('size', 0)
+        #A column file missing or shorter than the committed rows resets the snapshot, so the log is parsed again
+        if meta.get('version') != self.SNAPSHOT_VERSION or any(
+                not os.path.exists(path) or os.path.getsize(path) < size * getattr(self, name).dtype.itemsize
+                for name, path in self._snapshot_paths()):
+            meta, size = {}, 0
+        self.questions = meta.get('questions', [])
+        self.question_ids = dict((question, q_id) for q_id, question in enumerate(self.questions))
+        self._map(size)
+        return meta.get('state')
+
+    def _snapshot_paths(self):
+        return [(name, os.path.join(self._directory, file_name)) for name, file_name in self.SNAPSHOT_COLUMNS]
+
+    def _map(self, size):
+        """
+        Truncates the snapshot column files to size rows and memory maps them
+        """
+        np = self._np
+        self.size = size
+        for name, path in self._snapshot_paths():
+            dtype = getattr(self, name).dtype
+            #Drop the previous map before resizing the file under it
+            setattr(self, name, np.empty(0, dtype))
+            with open(path, 'ab') as column:
+                column.truncate(size * dtype.itemsize)
+            if size:
+                setattr(self, name, np.memmap(path, dtype, mode='r', shape=(size,)))
+
+    def commit(self, state):
+        """
+        Saves the questions, row count and load state of a snapshot, making the rows appended so far part of it
+        """
+        path = os.path.join(self._directory, 'snapshot.json')
+        with open(path + '.tmp', 'w') as fp:
+            json.dump({'version': self.SNAPSHOT_VERSION, 'size': self.size, 'questions': self.questions,
+                       'state': state}, fp)
+        os.replace(path + '.tmp', path)
+
+    def clear(self):
+        self.questions.clear()
+        self.question_ids.clear()
+        self.truncate(0)
+
+    def truncate(self, size):
+        """
+        Drops the rows appended after the first size rows
+        """
+        if self._directory is not None:
+            self._map(min(self.size, size))
+        else:
+            self.size = min(self.size, size)
+
+    def _intern(self, question):
+        q_id = self.question_ids.get(question)
+        if q_id is None:
+            q_id = len(self.questions)
+            self.questions.append(question)
+            self.question_ids[question] = q_id
+        return q_id
+
+    def append(self, rows):
+        """
+        Appends rows of (iso date, month, day, year, question, score), growing the arrays by doubling
+        """
+        np = self._np
+        end = self.size + len(rows)
+        days = np.array([_iso_to_ordinal(row[0]) for row in rows], np.int32)
+        question_ids = np.array([self._intern(row[4]) for row in rows], np.int16)
+        scores = np.array([_to_score(row[5]) for row in rows], np.float32)
+        if self._directory is not None:
+            for (_, path), column in zip(self._snapshot_paths(), (days, question_ids, scores)):
+                with open(path, 'ab') as fp:
+                    fp.write(column.tobytes())
+            self._map(end)
+            return
+
+        if end > len(self._days):
+            capacity = max(end, 2 * len(self._days))
+            for name in ('_days', '_question_ids', '_scores'):
+                column = getattr(self, name)
+                grown = np.empty(capacity, column.dtype)
+                grown[:self.size] = column[:self.size]
+                setattr(self, name, grown)
+        self._days[self.size:end] = days
+        self._question_ids[self.size:end] = question_ids
+        self._scores[self.size:end] = scores
+        self.size = end
+
+    def columns(self, start=None, end=None):
+        """
+        Returns the day, question id and float64 score arrays of the rows with start <= day ordinal < end
+        """
+        days = self._days[:self.size]
+        question_ids = self._question_ids[:self.size]
+        scores = self._scores[:self.size]
+        mask = None
+        if start is not None:
+            mask = days >= start
+        if end is not None:
+            mask = days < end if mask is None else mask & (days < end)
+        if mask is not None:
+            days, question_ids, scores = days[mask], question_ids[mask], scores[mask]
+        return days, question_ids, self._widen(scores)
+
+    def _widen(self, scores):
+        """
+        Converts float32 scores to the float64 of their shortest repr, once per distinct score.
+        A plain astype keeps float32's rounding error, 0.3 would become 0.30000001192092896.
+        """
+        np = self._np
+        values, inverse = np.unique(scores, return_inverse=True)
+        return np.array([float(str(value)) for value in values], np.float64)[inverse.reshape(-1)]
+
+    def nbytes(self):
+        return self._days.nbytes + self._question_ids.nbytes + self._scores.nbytes
+
+    def _order_questions(self, question_ids):
+        #ORDER BY LENGTH(text) DESC, text
+        return sorted(question_ids, key=lambda q_id: (-len(self.questions[q_id]), self.questions[q_id]))
+
+    def last_n_days(self, start, end):
+        """
+        Rows of (question, date, score, question length) between two day ordinals,
+        one per question and day (the first one logged), ordered like _get_last_n_days
+        """
+        np = self._np
+        days, question_ids, scores = self.columns(start, end)
+        keys = question_ids.astype(np.int64) * (1 << 32) + days
+        #Keep the first row logged for a question and day, as sqlite's GROUP BY does
+        _, index = np.unique(keys, return_index=True)
+
+        by_question = DefaultListOrderedDict()
+        for i in index.tolist():
+            by_question[int(question_ids[i])].append(i)
+        rows = []
+        for q_id in self._order_questions(by_question):
+            question = self.questions[q_id]
+            for i in by_question[q_id]:
+                rows.append((question, date.fromordinal(int(days[i])), _to_number(scores[i]), len(question)))
+        return rows
+
+    def daily(self, start):
+        """
+        Rows of (year, month, day, score sum, distinct question count) from a day ordinal on, in date order
+        """
+        np = self._np
+        days, question_ids, scores = self.columns(start)
+        if not len(days):
+            return []
+        #bincount adds each day's scores one by one in log order, like sqlite's SUM
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        sums = np.bincount(day_index.reshape(-1), weights=scores)
+        pairs = np.unique(days.astype(np.int64) * (1 << 16) + question_ids)
+        _, q_counts = np.unique(pairs >> 16, return_counts=True)
+
+        rows = []
+        for ordinal, score, q_count in zip(unique_days.tolist(), sums.tolist(), q_counts.tolist()):
+            day = date.fromordinal(ordinal)
+            rows.append((day.year, day.month, day.day, _to_number(score), q_count))
+        return rows
+
+    def daily_totals(self, start, end):
+        """
+        Score sums and row counts of every day from one day ordinal to another inclusive, as dense arrays
+        """
+        np = self._np
+        days, _, scores = self.columns(start, end + 1)
+        offsets = days - start
+        return (np.bincount(offsets, weights=scores, minlength=end - start + 1),
+                np.bincount(offsets, minlength=end - start + 1))
+
+    def question_sums(self, start, end):
+        """
+        Rows of (question, rows, score sum, day sum, day squared sum, day times score sum) between two
+        day ordinals inclusive, days counted from start, ordered by question length and text
+        """
+        np = self._np
+        days, question_ids, scores = self.columns(start, end + 1)
+        x = (days - start).astype(np.float64)
+        n_questions = len(self.questions)
+        counts = np.bincount(question_ids, minlength=n_questions)
+        sums = [np.bincount(question_ids, weights=weights, minlength=n_questions)
+                for weights in (scores, x, x * x, x * scores)]
+        present = [q_id for q_id in range(n_questions) if counts[q_id]]
+        return [(self.questions[q_id], int(counts[q_id])) + tuple(float(column[q_id]) for column in sums)
+                for q_id in self._order_questions(present)]
+
+    def _monthly_sums(self, keys, n_keys, days, scores):
+        """
+        Sums scores by key, first per key and month in log order and then over the months in date order,
+        the order sqlite adds up the monthly question and weekday rollups in
+        """
+        np = self._np
+        if not len(days):
+            return np.zeros(n_keys)
+        months = (days.astype(np.int64) - EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]')
+        months = months.astype(np.int64)
+        first = months.min()
+        n_months = int(months.max() - first) + 1
+        cells = np.bincount(keys.astype(np.int64) * n_months + (months - first), weights=scores,
+                            minlength=n_keys * n_months)
+        #cumsum adds one month at a time, a plain sum adds them pairwise
+        return np.cumsum(cells.reshape(n_keys, n_months), axis=1)[:, -1]
+
+    def score_by_weekday(self, start):
+        """
+        Rows of (weekday as in strftime('%w'), average score) from a day ordinal on
+        """
+        np = self._np
+        days, _, scores = self.columns(start)
+        #The weekday rollup adds up day sums, so do the same
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        day_sums = np.bincount(day_index.reshape(-1), weights=scores)
+        #Ordinal 1 is a Monday, so ordinal % 7 numbers days from Sunday = 0 like %w
+        sums = self._monthly_sums(unique_days % 7, 7, unique_days, day_sums)
+        counts = np.bincount(days % 7, minlength=7)
+        return [(weekday, float(sums[weekday] / counts[weekday])) for weekday in range(7) if counts[weekday]]
+
+    def score_by_question(self, start):
+        """
+        Rows of (question, average score) from a day ordinal on, ordered by question length and text
+        """
+        np = self._np
+        days, question_ids, scores = self.columns(start)
+        sums = self._monthly_sums(question_ids, len(self.questions), days, scores)
+        counts = np.bincount(question_ids, minlength=len(self.questions))
+        present = [q_id for q_id in range(len(self.questions)) if counts[q_id]]
+        return [(self.questions[q_id], float(sums[q_id] / counts[q_id])) for q_id in self._order_questions(present)]
+
+    def fingerprint(self):
+        """
+        Hash of the questions and every row, a single pass over the columns' raw bytes
+        """
+        digest = hashlib.sha1(repr((self.size, self.questions)).encode())
+        for column in (self._days, self._question_ids, self._scores):
+            digest.update(self._np.ascontiguousarray(column[:self.size]).data)
+        return digest.hexdigest()
+
+class _LogLines:
+    """
+    Iterates the decoded lines of a binary log file from its current position, keeping end at the offset
+    after the last line read. With complete_only a last line without its newline is left for the next load,
+    as it may still be being written, otherwise it is read and partial is set.
+    """
+
+    def __init__(self, txtfile, complete_only=False):
+        self._txtfile = txtfile
+        self._complete_only = complete_only
+        self.end = txtfile.tell()
+        self.partial = False
+
+    def __iter__(self):
+        for line in self._txtfile:
+            if not line.endswith(b'\n'):
+                if self._complete_only:
+                    return
+                self.partial = True
+            self.end += len(line)
+            yield line.decode('utf-8')
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+def _cached_report(method):
+    """
+    Memoizes a report method on the data fingerprint, the report settings and today's date,
+    in an LRU of cache_size entries and optionally in cache_dir.
+    """
+    @wraps(method)
+    def wrapper(self):
+        if not self._cache_size and self._cache_dir is None:
+            return method(self)
+
+        key = self._get_cache_key(method.__name__)
+        html = self._render_cache.get(key)
+        if html is not None:
+            self._render_cache.move_to_end(key)
+            self._cache_hits += 1
+            return html
+
+        html = self._read_disk_cache(key)
+        if html is None:
+            self._cache_misses += 1
+            html = method(self)
+            self._write_disk_cache(key, html)
+        else:
+            self._cache_hits += 1
+
+        if self._cache_size:
+            self._render_cache[key] = html
+            while len(self._render_cache) > self._cache_size:
+                self._render_cache.popitem(last=False)
+        return html
+    return wrapper
+
+StageStats = namedtuple('StageStats', ['calls', 'seconds', 'rows', 'bytes'])
+
+def _html_size(result):
+    return len(result.encode('utf-8')) if isinstance(result, str) else 0
+
+def _instrumented(count=len, size=_html_size):
+    """
+    Records the calls, wall time, rows and bytes of a pipeline stage when the instance is instrumented,
+    see DailyQuestions.stats. count returns the rows of the stage's result, None for renderers,
+    and size its bytes, by default the UTF-8 length of returned HTML.
+    Times include nested stages, so a renderer's time includes its queries.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self._instrument:
+                return method(self, *args, **kwargs)
+
+            #Only the outermost stage switches the profiler, nested stages are already inside it
+            profiling = self._profiler is not None and self._stage_depth == 0
+            self._stage_depth += 1
+            if profiling:
+                self._profiler.enable()
+            start = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+                #Cursors are consumed here so their rows and the time taken to fetch them are counted
+                if isinstance(result, sqlite3.Cursor):
+                    result = result.fetchall()
+                seconds = time.perf_counter() - start
+            finally:
+                self._stage_depth -= 1
+                if profiling:
+                    self._profiler.disable()
+
+            _add_stage_stats(self, method.__name__, seconds, count(result) if count is not None else 0, size(result))
+            return result
+        return wrapper
+    return decorator
+
+def _instrumented_chunks(method):
+    """
+    _instrumented for the iter_* renderers, recording the time spent producing chunks but not the time
+    the caller spends between them, and the UTF-8 bytes of the chunks. A generator closed early records
+    what it yielded.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._instrument:
+            yield from method(self, *args, **kwargs)
+            return
+
+        chunks = method(self, *args, **kwargs)
+        seconds = 0.0
+        size = 0
+        try:
+            while True:
+                profiling = self._profiler is not None and self._stage_depth == 0
+                self._stage_depth += 1
+                if profiling:
+                    self._profiler.enable()
+                start = time.perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                    self._stage_depth -= 1
+                    if profiling:
+                        self._profiler.disable()
+                size += _html_size(chunk)
+                yield chunk
+        finally:
+            _add_stage_stats(self, method.__name__, seconds, 0, size)
+    return wrapper
+
+def _add_stage_stats(dq, stage, seconds, rows, size):
+    stats = dq._stage_stats.get(stage, StageStats(0, 0.0, 0, 0))
+    dq._stage_stats[stage] = StageStats(stats.calls + 1, stats.seconds + seconds, stats.rows + rows, stats.bytes + size)
+
 class DailyQuestions:
 
     def __init__(self,
@@ -53,121 +620,665 @@ class DailyQuestions:
                  n_months = 2,
                  score_multiplier = 20,
                  print_only_decimals = False,
-                 censor_questions = False):
+                 censor_questions = False,
+                 db_path = None,
+                 cache_size = 32,
+                 cache_dir = None,
+                 cache_dir_size = 256,
+                 read_only = False,
+                 backend = 'sqlite',
+                 snapshot_dir = None,
+                 instrument = False,
+                 profile = False):
         """
-        Args:   content - text or file name of daily questions
+        Args:   content - text or file name of daily questions, or any iterable of lines or
+                          file-like object (stdin, a pipe, a socket reader) which is read lazily
                 score_rage - touble of form (lower_bound, upper_bound_inclusive)
                 question_prefix - text to be added before each question "Did I do my best too..."
                 n_days - number of days to include in day view
                 n_months = number of months to be included in month view
+                db_path - optional sqlite file used to persist parsed rows between runs.
+                          When set, loadContent only parses lines appended since the last load,
+                          and a last line without its newline is left for a later load.
+                cache_size - number of rendered reports kept in memory, 0 disables the cache
+                cache_dir - optional directory where rendered reports are also kept between runs
+                cache_dir_size - number of reports kept in cache_dir, the least recently used are deleted
+                                 after each write. None keeps every report.
+                read_only - open db_path read-only to render reports from a store another process loads.
+                            The connection may be used from other threads, one at a time.
+                backend - 'sqlite' or 'numpy'. 'numpy' keeps the rows in a ColumnarStore of NumPy arrays,
+                          which is smaller and faster to aggregate but cannot be persisted with db_path.
+                snapshot_dir - optional directory where the numpy backend keeps the whole parsed history as memory
+                               mapped columns. loadContent then only parses lines appended since the last load,
+                               leaving a last line without its newline for a later load as with db_path.
+                instrument - record wall time, rows and bytes of every load, query and render stage, see stats
+                profile - also run the stages under cProfile, see dump_profile. Implies instrument.
         """
         self._content = content
         self._score_range = score_range
         self._scale = scale
         self._question_prefix = question_prefix
-        self.n_days = n_days if n_days > 0 else 10
-        self.n_months = n_months-1 if n_months <= 12 else 12
+        self.set_window(n_days, n_months)
         self._score_multiplier = score_multiplier
         self._print_only_decimals = print_only_decimals
         self._censor_questions = censor_questions
-        self._con = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
-        self._cur = self._con.cursor()
-        self._cur.execute("CREATE TABLE daily_question (date DATE, month INTEGER, day INTEGER, "+
-                          "year INTEGER, question, score INTEGER)")
+        self._db_path = db_path
+        self._cache_size = cache_size
+        self._cache_dir = cache_dir
+        self._cache_dir_size = cache_dir_size
+        self._render_cache = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._fingerprint = None
+        self._instrument = instrument or profile
+        self._stage_stats = OrderedDict()
+        self._stage_depth = 0
+        self._profiler = None
+        if profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+        self._read_only = read_only
+        if backend not in ('sqlite', 'numpy'):
+            raise ValueError("backend must be 'sqlite' or 'numpy', not {!r}".format(backend))
+        if backend == 'numpy' and db_path is not None:
+            raise ValueError("the numpy backend is in-memory only and cannot use a db_path")
+        if snapshot_dir is not None and backend != 'numpy':
+            raise ValueError("snapshot_dir requires the numpy backend")
+        self._columns = ColumnarStore() if backend == 'numpy' else None
+        self._chart_renderer = None
+        #Rendered day table rows and month blocks of the last render, see _iter_table_rows
+        self._row_html = {}
+        self._month_html = {}
+        self._watch_stat = None
+        self._complete_lines_only = False
+        self._snapshot_dir = snapshot_dir
+        self._snapshot_state = self._columns.attach(snapshot_dir) if snapshot_dir is not None else None
+        if read_only:
+            if db_path is None:
+                raise ValueError("read_only requires a db_path")
+            self._con = sqlite3.connect('file:{}?mode=ro'.format(pathname2url(os.path.abspath(db_path))), uri=True,
+                                        detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+            self._cur = self._con.cursor()
+            if self._cur.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                raise ValueError("{} is not a daily questions store of schema version {}".format(db_path,
+                                                                                            SCHEMA_VERSION))
+        else:
+            self._con = sqlite3.connect(db_path or ":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+            self._cur = self._con.cursor()
+            self._create_schema()
+        self._question_ids = dict((text, q_id) for q_id, text in self._cur.execute("SELECT id, text FROM question"))
 
+    def set_window(self, n_days, n_months):
+        """
+        Sets the number of days in the day view and months in the month view
+        """
+        self.n_days = n_days if n_days > 0 else 10
+        self.n_months = n_months-1 if n_months <= 12 else 12
 
-    def loadContent(self):
+    def _create_schema(self):
+        """
+        Creates the tables, dropping those of an on-disk store written with another SCHEMA_VERSION.
+        Other tables in the file are left alone, and a file whose user_version is not one of a store's
+        is refused rather than changed.
+        """
+        user_version = self._cur.execute("PRAGMA user_version").fetchone()[0]
+        if user_version > SCHEMA_VERSION or user_version < 0:
+            raise ValueError("{} is not a daily questions store, its user_version is {}".format(self._db_path,
+                                                                                           user_version))
+        if user_version != SCHEMA_VERSION:
+            for table in STORE_TABLES:
+                self._cur.execute("DROP TABLE IF EXISTS {}".format(table))
+            self._cur.execute("PRAGMA user_version = {}".format(SCHEMA_VERSION))
+        for statement in SCHEMA:
+            self._cur.execute(statement)
+        self._con.commit()
+
+    def loadContent(self, since=None):
         """
         Initializes the DailyQuestions database
         If the content is of file type txt it initializes by parsing the file else by reading each row in content.
-        returns row count added
+        Rows older than the month view are skipped unless since, the earliest date to load, is given;
+        date.min loads the whole log for get_daily_scores, get_rolling_average and get_question_trends.
+        returns row count read and row count added
         """
+        if self._read_only:
+            raise ValueError("a read_only DailyQuestions cannot load content")
         #Set look back date and cut_date from max between n_days and n_months
         look_back = max(self.n_days//31, self.n_months)
         self._cut_date = datetime.today() - relativedelta(months=look_back)
         self._cut_date = date(self._cut_date.date().year, self._cut_date.date().month, 1)
+        if since is not None:
+            self._cut_date = since
+        if self._snapshot_dir is not None:
+            #A snapshot keeps the whole history, so any window can be reported from it
+            self._cut_date = date.min
 
-        if self._content.endswith('.txt'):
+        if self._is_file_content():
             return self._loadFromFile()
         else:
             return self._loadFromText()
 
+    def poll(self):
+        """
+        Loads the lines appended to the log file since the last load, if the file changed.
+        A last line without its newline is left for a later poll. A log replaced by another file,
+        as by log rotation, or truncated is loaded again from its start. A missing log, as between
+        a rotation moving it away and the new one being created, counts as unchanged.
+        returns row count read and row count added, or None if the file is unchanged
+        """
+        if not self._is_file_content():
+            raise ValueError("poll and watch follow a log file, not text or a stream")
+        try:
+            stat = os.stat(self._content)
+        except FileNotFoundError:
+            return None
+        watch_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if watch_stat == self._watch_stat:
+            return None
+        if self._watch_stat is not None and stat.st_ino != self._watch_stat[0]:
+            self._reset_store()
+        self._watch_stat = watch_stat
+
+        self._complete_lines_only = True
+        try:
+            return self.loadContent()
+        finally:
+            self._complete_lines_only = False
+
+    def watch(self, on_update=None, interval=0.25, stop=None):
+        """
+        Follows the log file, polling it every interval seconds until stop, a threading.Event, is set.
+        Only appended lines are parsed and the rollups updated with them, and the next render re-formats
+        only the day table rows and month calendars they changed.
+        The watch runs in the calling thread, which owns the store, so reports are rendered from on_update.
+        Args:   on_update - called as on_update(self, row_count, insert_count) after every load
+        """
+        while stop is None or not stop.is_set():
+            loaded = self.poll()
+            if loaded is not None and on_update is not None:
+                on_update(self, *loaded)
+            if stop is None:
+                time.sleep(interval)
+            else:
+                stop.wait(interval)
+
+    def _is_file_content(self):
+        return isinstance(self._content, os.PathLike) or \
+               (isinstance(self._content, str) and self._content.endswith('.txt'))
+
     def _extract_values_from_row(self, row):
         #Clean date row, format and extract date fields
         #row[0] = row[0].replace(",","").replace("at","")
-        dateTime= time.strptime(row[0],'%Y/%m/%d')
-        sdate = time.strftime("%Y-%m-%d",dateTime)
-        month = int(time.strftime('%m',dateTime))
-        day = int(time.strftime('%d',dateTime))
-        year = int(time.strftime('%Y',dateTime))
+        sdate, month, day, year = _parse_log_date(row[0])
         #Extract question and score
         question = row[1].strip()
         score = row[2]
         return sdate, month, day, year, question, score
 
+    def _insert_rows(self, reader):
+        """
+        Parses rows and inserts the ones on or after the cut date with executemany,
+        INSERT_BATCH_SIZE rows at a time and within a single transaction.
+        returns row count read and row count inserted
+        """
+        cut_date = self._cut_date.isoformat()
+        row_count = 0
+        insert_count = 0
+        batch = []
+        for row in reader:
+            #Skip any row that does not match the format, including empty rows.
+            if len(row) != 3:
+                continue
+            row_count += 1
+            #Clean date row, format and extract date fields
+            values = self._extract_values_from_row(row)
+
+            #Only insert date if it will be used, iso dates sort like the dates themselves
+            if values[0] < cut_date:
+                continue
+            if self._censor_questions:
+                values = values[:4] + (_censor_question(values[4]), values[5])
+            batch.append(values)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                insert_count += self._insert_batch(batch)
+                batch = []
+
+        if batch:
+            insert_count += self._insert_batch(batch)
+        return row_count, insert_count
+
+    @_instrumented(count=lambda result: result)
+    def _insert_batch(self, batch):
+        """
+        Inserts a batch of rows, replacing question text by its id, and adds them to the rollup tables.
+        returns row count inserted
+        """
+        if self._columns is not None:
+            self._data_changed()
+            self._columns.append(batch)
+            return len(batch)
+
+        rows = []
+        for values in batch:
+            q_id = self._question_ids.get(values[4])
+            if q_id is None:
+                q_id = self._cur.execute("INSERT INTO question (text) VALUES (?)", (values[4],)).lastrowid
+                self._question_ids[values[4]] = q_id
+            rows.append(values[:4] + (q_id, values[5]))
+        self._cur.executemany("INSERT INTO daily_question VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._update_rollups(rows)
+        return len(rows)
+
+    def _get_last_row(self):
+        """
+        Marks the rows stored so far, see _delete_rows_after
+        """
+        if self._columns is not None:
+            return self._columns.size
+        return self._cur.execute("SELECT MAX(rowid) FROM daily_question").fetchone()[0] or 0
+
+    def _delete_rows_after(self, last_row):
+        """
+        Deletes the rows stored after a _get_last_row mark
+        """
+        if self._columns is not None:
+            self._data_changed()
+            self._columns.truncate(last_row)
+            return
+        self._cur.execute("DELETE FROM daily_question WHERE rowid > ?", (last_row,))
+        self._rebuild_rollups()
+
+    def _update_rollups(self, rows):
+        """
+        Adds inserted rows to the rollup tables.
+        Question and weekday rollups are incremented by sums and counts taken from the rows themselves,
+        only days with new rows are recomputed from daily_question so their distinct question count stays exact.
+        """
+        self._data_changed()
+        day_sums = {}
+        question_sums = {}
+        for sdate, month, day, year, q_id, score in rows:
+            score = _score_value(score)
+            sums = day_sums.get(sdate)
+            if sums is None:
+                sums = day_sums[sdate] = [year, month, day, 0, 0]
+            sums[3] += score
+            sums[4] += 1
+            sums = question_sums.get((q_id, year, month))
+            if sums is None:
+                sums = question_sums[(q_id, year, month)] = [0, 0]
+            sums[0] += score
+            sums[1] += 1
+        #Weekdays are taken from the per day sums so they are computed once per day, not per row
+        weekday_sums = {}
+        for year, month, day, score_sum, row_count in day_sums.values():
+            #sqlite's %w numbering, 0 is Sunday
+            key = (date(year, month, day).isoweekday() % 7, year, month)
+            sums = weekday_sums.setdefault(key, [0, 0])
+            sums[0] += score_sum
+            sums[1] += row_count
+
+        self._cur.executemany("INSERT OR REPLACE INTO daily_rollup "+
+                              "SELECT date, year, month, day, SUM(score), COUNT(*), COUNT(DISTINCT(question_id)) "+
+                              "FROM daily_question WHERE date = ? GROUP BY date", ((sdate,) for sdate in day_sums))
+        for rollup, key_column, totals in (('question_rollup', 'question_id', question_sums),
+                                           ('weekday_rollup', 'weekday', weekday_sums)):
+            self._cur.executemany("INSERT OR IGNORE INTO {} VALUES (?, ?, ?, 0, 0)".format(rollup), totals)
+            self._cur.executemany(("UPDATE {} SET score_sum = score_sum + ?, row_count = row_count + ? "+
+                                   "WHERE {} = ? AND year = ? AND month = ?").format(rollup, key_column),
+                                  (tuple(sums) + key for key, sums in totals.items()))
+
+    def _window_hash(self, txtfile, start, end, window=None):
+        """
+        Hash of the bytes from start to end, the part of the log parsed into the store, used to detect
+        a file rewritten in place. window is the hash of the bytes parsed before start to continue from.
+        returns the hashlib object
+        """
+        window = hashlib.sha1() if window is None else window.copy()
+        txtfile.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = txtfile.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            window.update(chunk)
+            remaining -= len(chunk)
+        return window
+
+    def _reset_store(self):
+        self._data_changed()
+        self._cur.execute("DELETE FROM daily_question")
+        self._cur.execute("DELETE FROM question")
+        for rollup in ('daily_rollup', 'question_rollup', 'weekday_rollup'):
+            self._cur.execute("DELETE FROM {}".format(rollup))
+        self._cur.execute("DELETE FROM load_state")
+        self._question_ids.clear()
+        if self._columns is not None:
+            self._columns.clear()
+            self._snapshot_state = None
+
+    def _rebuild_rollups(self):
+        """
+        Recomputes the rollup tables from daily_question, needed after rows are deleted
+        """
+        self._data_changed()
+        for rollup in ('daily_rollup', 'question_rollup', 'weekday_rollup'):
+            self._cur.execute("DELETE FROM {}".format(rollup))
+        self._cur.execute("INSERT INTO daily_rollup "+
+                          "SELECT date, year, month, day, SUM(score), COUNT(*), COUNT(DISTINCT(question_id)) "+
+                          "FROM daily_question GROUP BY date")
+        self._cur.execute("INSERT INTO question_rollup "+
+                          "SELECT question_id, year, month, SUM(score), COUNT(*) "+
+                          "FROM daily_question GROUP BY question_id, year, month")
+        self._cur.execute("INSERT INTO weekday_rollup "+
+                          "SELECT CAST(strftime('%w', date) AS INTEGER) as weekday, year, month, "+
+                          "SUM(score), COUNT(*) FROM daily_question GROUP BY weekday, year, month")
+
+    def _data_changed(self):
+        """
+        Drops the data fingerprint and the rendered reports, called whenever rows change
+        """
+        self._fingerprint = None
+        self._render_cache.clear()
+
+    def _get_fingerprint(self):
+        """
+        Identifies the loaded data: its source, last row id, question ids, a summary of the daily rollup
+        and its content. File loads are identified by their load state, which hashes the bytes parsed,
+        other loads by the question texts and per question totals.
+        """
+        #A read-only store is loaded by another process, so its fingerprint is never kept
+        if self._fingerprint is None or self._read_only:
+            source = os.path.abspath(self._content) if self._is_file_content() else None
+            if self._columns is not None:
+                self._fingerprint = hashlib.sha1(repr((source, self._columns.fingerprint())).encode()).hexdigest()
+                return self._fingerprint
+            last_rowid = self._cur.execute("SELECT MAX(rowid) FROM daily_question").fetchone()[0]
+            summary = self._cur.execute("SELECT COUNT(*), TOTAL(score_sum), TOTAL(row_count), TOTAL(q_count), "+
+                                        "MIN(date), MAX(date) FROM daily_rollup").fetchone()
+            questions = self._cur.execute("SELECT COUNT(*), MAX(id) FROM question").fetchone()
+            content = self._cur.execute("SELECT * FROM load_state ORDER BY source").fetchall()
+            if not content:
+                content = self._cur.execute("SELECT text, TOTAL(score_sum), TOTAL(row_count) "+
+                                            "FROM question LEFT JOIN question_rollup ON question_id = id "+
+                                            "GROUP BY id ORDER BY id").fetchall()
+            self._fingerprint = hashlib.sha1(repr((source, last_rowid, tuple(summary), tuple(questions),
+                                                   content)).encode()).hexdigest()
+        return self._fingerprint
+
+    def _get_cache_key(self, report):
+        """
+        Key of a rendered report: everything its HTML depends on, including today's date
+        """
+        key = (report, self._get_fingerprint(), self.n_days, self.n_months, self._censor_questions,
+               self._print_only_decimals, tuple(self._score_range), tuple(self._scale), self._question_prefix,
+               self._score_multiplier, datetime.today().date().isoformat())
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def _read_disk_cache(self, key):
+        if self._cache_dir is None:
+            return None
+        path = os.path.join(self._cache_dir, key + '.html')
+        try:
+            with open(path) as cached:
+                html = cached.read()
+        except FileNotFoundError:
+            return None
+        #Touch hits so pruning by mtime drops the least recently used reports
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def _write_disk_cache(self, key, html):
+        if self._cache_dir is None:
+            return
+        os.makedirs(self._cache_dir, exist_ok=True)
+        #Write then rename so a concurrent reader never sees a partial report
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as cached:
+            cached.write(html)
+        os.replace(tmp_path, os.path.join(self._cache_dir, key + '.html'))
+        if self._cache_dir_size is not None:
+            self._prune_disk_cache()
+
+    def _prune_disk_cache(self):
+        """
+        Deletes the reports in cache_dir beyond cache_dir_size, oldest mtime first.
+        Files another process deletes meanwhile are skipped.
+        """
+        entries = []
+        with os.scandir(self._cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith('.html'):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        continue
+        if len(entries) <= self._cache_dir_size:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self._cache_dir_size]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cache_info(self):
+        """
+        Returns the render cache hits, misses, maximum and current size
+        """
+        return CacheInfo(self._cache_hits, self._cache_misses, self._cache_size, len(self._render_cache))
+
+    def cache_clear(self):
+        """
+        Empties the in-memory render cache and resets its counters
+        """
+        self._render_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def stats(self):
+        """
+        Returns the StageStats of every stage run since the last stats_clear, keyed by method name.
+        Empty unless the instance was created with instrument or profile.
+        """
+        return OrderedDict(self._stage_stats)
+
+    def stats_clear(self):
+        """
+        Resets the stage stats and the profile
+        """
+        self._stage_stats.clear()
+        if self._profiler is not None:
+            self._profiler.clear()
+
+    def dump_profile(self, path):
+        """
+        Writes the cProfile stats of the stages run so far to path, readable with pstats
+        """
+        if self._profiler is None:
+            raise ValueError("dump_profile requires a DailyQuestions created with profile=True")
+        self._profiler.dump_stats(path)
+
+    def prometheus_text(self):
+        """
+        Returns the stage stats in the Prometheus text exposition format
+        """
+        lines = []
+        for field, help_text in (('calls', 'Calls of a pipeline stage'),
+                                 ('seconds', 'Wall time spent in a pipeline stage'),
+                                 ('rows', 'Rows read, inserted or returned by a pipeline stage'),
+                                 ('bytes', 'HTML bytes rendered by a pipeline stage')):
+            metric = 'daily_questions_stage_{}_total'.format(field)
+            lines.append('# HELP {} {}'.format(metric, help_text))
+            lines.append('# TYPE {} counter'.format(metric))
+            for stage, stats in self._stage_stats.items():
+                lines.append('{}{{stage="{}"}} {}'.format(metric, stage, getattr(stats, field)))
+        return '\n'.join(lines) + '\n'
+
+    def _get_resume_offset(self, txtfile, source, stat):
+        """
+        Returns the byte offsets the stored rows were parsed from and up to, their cut date and the hash
+        of the bytes in between, or zeros, the current cut date and None.
+        On the first load, or when the file was truncated, rewritten or loaded with other settings,
+        the store is cleared and the whole file is parsed again. A file is taken as rewritten when the
+        bytes already parsed hash differently, or when its size is unchanged but its mtime is not.
+        """
+        if self._snapshot_dir is not None:
+            state = self._snapshot_state
+            if state is not None:
+                state = (state['start'], state['offset'], state['size'], state['mtime'], state['window_hash'],
+                         date(*map(int, state['cut_date'].split('-'))),
+                         state['censored']) if state['source'] == source else None
+        else:
+            state = self._cur.execute("SELECT start, offset, size, mtime, window_hash, cut_date, censored "+
+                                      "FROM load_state WHERE source = ?", (source,)).fetchone()
+        if state is not None:
+            start, offset, size, mtime, window_hash, cut_date, censored = state
+            if (offset <= stat.st_size and cut_date <= self._cut_date and
+                    bool(censored) == self._censor_questions and
+                    (stat.st_size != size or stat.st_mtime == mtime)):
+                window = self._window_hash(txtfile, start, offset)
+                if window.hexdigest() == window_hash:
+                    return start, offset, cut_date, window
+
+        self._reset_store()
+        return 0, 0, self._cut_date, None
+
+    def _save_load_state(self, source, stat, start, offset, cut_date, window):
+        if self._snapshot_dir is not None:
+            self._snapshot_state = {'source': source, 'start': start, 'offset': offset, 'size': stat.st_size,
+                                    'mtime': stat.st_mtime, 'window_hash': window.hexdigest(),
+                                    'cut_date': cut_date.isoformat(), 'censored': int(self._censor_questions)}
+            self._columns.commit(self._snapshot_state)
+            return
+        self._cur.execute("INSERT OR REPLACE INTO load_state VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (source, start, offset, stat.st_size, stat.st_mtime, window.hexdigest(),
+                           cut_date.isoformat(), int(self._censor_questions)))
+
+    def _skip_to_cut_date(self, txtfile, size):
+        """
+        Memory maps the file and binary searches the date ordered log for the first line on or after the cut date.
+        The lines up to DISORDER_SLACK_DAYS before the cut date preceding that offset are checked, and if any
+        is on or after the cut date the log is out of order and it is parsed from the start instead.
+        returns the offset to start parsing from
+        """
+        if size == 0 or self._cut_date == date.min:
+            return 0
+        cut_date = self._cut_date.isoformat()
+        floor_date = (self._cut_date - timedelta(days=DISORDER_SLACK_DAYS)).isoformat()
+        with mmap.mmap(txtfile.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            offset = _find_cut_offset(buf, cut_date)
+            if _has_lines_since(buf, offset, cut_date, floor_date):
+                return 0
+            return offset
+
+    @_instrumented(count=lambda result: result[0])
     def _loadFromFile(self):
-        with open(self._content, "r") as txtfile:
-            reader = csv.reader(txtfile, delimiter='|', quotechar='"')
-            row_count = 0
-            insert_count = 0
-            for row in reader:
-                #Skip any row that does not matcht he format, including empty rows.
-                if len(row) == 3:
-                    #Clean date row, format and extract date fields
-                    sdate, month, day, year, question, score = self._extract_values_from_row(row)
-
-                    #Only insert date if it will be used
-                    if date(year, month, day) >= self._cut_date:
-                        #Writte to in-memory database
-                        if self._censor_questions:
-                            question = ''.join([ '*' if i%3 == 0 else ch for i, ch in enumerate(question)])
-                        #Writte to in-memory database
-                        self._cur.execute("INSERT INTO daily_question VALUES (?, ?, ?, ?, ?, ?)", \
-                                          (sdate, month, day, year, question, score))
-                        insert_count += 1
-                    row_count += 1
+        """
+        Parses the log from where the last load stopped, or on a fresh load from the first line
+        on or after the cut date. If any line past that point is older than the cut date the log
+        is not date ordered, so those rows are discarded and the whole file is scanned instead.
+        Loads into a db_path or snapshot_dir or by poll stop before a last line without its newline,
+        as resuming after it would parse the rest of that line as a line of its own. Other loads parse it,
+        but then save no load state, so the next load parses the file again instead of resuming.
+        """
+        complete_only = (self._complete_lines_only or self._db_path is not None or
+                         self._snapshot_dir is not None)
+        source = os.path.abspath(self._content)
+        with open(self._content, "rb") as txtfile:
+            stat = os.fstat(txtfile.fileno())
+            start, offset, cut_date, window = self._get_resume_offset(txtfile, source, stat)
+            skip_scan = offset == 0
+            if skip_scan:
+                offset = self._skip_to_cut_date(txtfile, stat.st_size)
+                #The hash also covers the bytes right before the window, so rewrites are noticed while it is empty
+                start = max(0, offset - 1024)
+                window = self._window_hash(txtfile, start, offset)
+                last_row = self._get_last_row()
+
+            txtfile.seek(offset)
+            lines = _LogLines(txtfile, complete_only)
+            row_count, insert_count = self._insert_rows(csv.reader(lines, delimiter='|', quotechar='"'))
+
+            if skip_scan and offset > 0 and row_count > insert_count:
+                self._delete_rows_after(last_row)
+                start, offset, window = 0, 0, None
+                txtfile.seek(0)
+                lines = _LogLines(txtfile, complete_only)
+                row_count, insert_count = self._insert_rows(csv.reader(lines, delimiter='|', quotechar='"'))
+
+            if lines.partial:
+                self._cur.execute("DELETE FROM load_state WHERE source = ?", (source,))
+            else:
+                #Only the bytes parsed by this load are read again, appended to the hash of those before them
+                self._save_load_state(source, stat, start, lines.end, cut_date,
+                                      self._window_hash(txtfile, offset, lines.end, window))
+        self._con.commit()
         return row_count, insert_count
 
+    @_instrumented(count=lambda result: result[0])
     def _loadFromText(self):
-        for line in self._content.split('\n'):
-            row = line.split('|')
-            row_count = 0
-            insert_count = 0
-            #Clean date row, format and extract date fields
-            sdate, month, day, year, question, score = self._extract_values_from_row(row, True)
-
-            #Only insert date if it will be used
-            if date(year, month, day) >= self._cut_date:
-                #Writte to in-memory database
-                if self._censor_questions:
-                    question = ''.join([ '*' if i%3 == 0 else ch for i, ch in enumerate(question)])
-                self._cur.execute("INSERT INTO daily_question VALUES (?, ?, ?, ?, ?, ?)", \
-                                  (sdate, month, day, year, question, score))
-                insert_count += 1
-            row_count += 1
+        """
+        Parses text, an iterable of lines or a file-like object lazily and inserts it in batches.
+        Streams cannot be resumed, so the store is rebuilt from them on every load.
+        """
+        self._reset_store()
+        reader = csv.reader(_iter_lines(self._content), delimiter='|', quotechar='"')
+        row_count, insert_count = self._insert_rows(reader)
+        if self._snapshot_dir is not None:
+            self._columns.commit(None)
+        self._con.commit()
         return row_count, insert_count
 
+    @_instrumented()
     def _get_last_n_days(self):
         """
-        Get all rows of daily questions for the last n_days
+        Get all rows of daily questions for the last n_days, up to yesterday
         """
-        cut_date = (datetime.today() - timedelta(days=self.n_days)).date()
-        result = self._cur.execute("SELECT question, date, score, LENGTH(question) as qlen "+
-                                   "FROM daily_question where date >= date({}) ".format(cut_date)+
-                                   "GROUP BY question, date ORDER BY qlen DESC")
+        today = datetime.today().date()
+        return self._get_question_days(today - timedelta(days=self.n_days), today)
+
+    def _get_question_days(self, start, end):
+        """
+        Rows of (question, date, score, question length) from start up to end excluded,
+        one per question and day, ordered by question length and text
+        """
+        if self._columns is not None:
+            return self._columns.last_n_days(start.toordinal(), end.toordinal())
+        result = self._cur.execute("SELECT text, date, score, LENGTH(text) as qlen "+
+                                   "FROM daily_question JOIN question ON question.id = question_id "+
+                                   "WHERE date >= ? AND date < ? "+
+                                   "GROUP BY question_id, date ORDER BY qlen DESC, text",
+                                   (start.isoformat(), end.isoformat()))
         return result
 
+    def _get_month_cut_date(self):
+        """
+        First day of the oldest month in the month view
+        """
+        cut_date = datetime.today() - relativedelta(months=self.n_months)
+        return date(cut_date.year, cut_date.month, 1)
+
+    def _get_month_key(self):
+        """
+        Oldest month in the month view as year * 100 + month, the key of the monthly rollups
+        """
+        cut_date = self._get_month_cut_date()
+        return cut_date.year * 100 + cut_date.month
+
+    @_instrumented()
     def _get_last_n_months(self, days=True):
         """
         Get all rows of dailyquestions for the last n months.
         Aggregated by date
         """
-        cut_date = datetime.today() - relativedelta(months=1)
-        cut_date = date(cut_date.date().year, cut_date.date().month, 1)
-        result = self._cur.execute("SELECT year, month, day, SUM(score) score, " +
-                                   "COUNT(DISTINCT(question)) as q_count " +
-                                   "FROM daily_question WHERE date >= date({}) ".format(cut_date) +
-                                   "GROUP BY date ORDER BY date ASC")
+        if self._columns is not None:
+            return self._columns.daily(self._get_month_cut_date().toordinal())
+        result = self._cur.execute("SELECT year, month, day, score_sum, q_count FROM daily_rollup " +
+                                   "WHERE date >= ? ORDER BY date ASC", (self._get_month_cut_date().isoformat(),))
 
         return result
 
@@ -182,12 +1293,12 @@ class DailyQuestions:
 
     def _get_questions_to_date_score(self, last_n_days):
         """
-        Map questions to dates and corresponding scores
-        returns an implementatin of OrderedDict that maps keys to lists of toubles
+        Map questions to dates and corresponding scores in a single pass
+        returns an implementatin of OrderedDict that maps each question to a dict of date to score
         """
-        questions_to_date = DefaultListOrderedDict()
+        questions_to_date = DefaultDictOrderedDict()
         for question, date, score, _ in last_n_days:
-                questions_to_date[question].append((date, score))
+                questions_to_date[question][date] = score
         return questions_to_date
 
     def _get_date_headers(self, date_list):
@@ -195,29 +1306,29 @@ class DailyQuestions:
         Generate table headers for daily report
         returns an html table header, list of text titles and mapping from months to valid dates
         """
-        day_header = '<tr style="background-color:#dddddd">'
+        day_header = ['<tr style="background-color:#dddddd">']
         month_to_days = DefaultIntOrderedDict()
         for date in date_list:
             #Save month for later use in colspan group
             month = date.strftime('%b')
             month_to_days[month] += 1
-            day_header += '<th scope="col" style="box-sizing: content-box;">{:2}</th>'.format(date.day)
+            day_header.append('<th scope="col" style="box-sizing: content-box;">{:2}</th>'.format(date.day))
 
-        day_header += ('<th scope="col">Grade({})</th><th scope="col"></th></tr>').format(max(self._scale), len(date_list))
-        return day_header, month_to_days
+        day_header.append(('<th scope="col">Grade({})</th><th scope="col"></th></tr>').format(max(self._scale), len(date_list)))
+        return ''.join(day_header), month_to_days
 
     def _get_html_month_headers(self, month_to_days):
         """
         Generates html month headers for the day table
         """
-        cols ='<col>'
-        month_header = '<tr><td style="text-align: left;" rowspan="2">{}</td>'.format(self._question_prefix)
+        cols = ['<col>']
+        month_header = ['<tr><td style="text-align: left;" rowspan="2">{}</td>'.format(self._question_prefix)]
         for month, days in month_to_days.items():
-            cols += '<colgroup span="{}"></colgroup>'.format(days)
-            month_header += ('<th style="text-align: left" colspan="{}" scope="colgroup">{}</th>').format(days+2, month)
-        cols += '<colgroup span="1"></colgroup>'
-        month_header += '</tr>'
-        return cols, month_header
+            cols.append('<colgroup span="{}"></colgroup>'.format(days))
+            month_header.append(('<th style="text-align: left" colspan="{}" scope="colgroup">{}</th>').format(days+2, month))
+        cols.append('<colgroup span="1"></colgroup>')
+        month_header.append('</tr>')
+        return ''.join(cols), ''.join(month_header)
 
     def _get_question_smiley(self, q_total, n_dates):
         """
@@ -253,55 +1364,64 @@ class DailyQuestions:
 
         return smiley, score, score_color
 
-    def _get_table_rows(self, last_n_days, date_list):
+    def _iter_table_rows(self, last_n_days, date_list):
         """
-        Generate the table rows for each question in the given date range.
+        Generate the table rows for each question in the given date range, one question row at a time.
         """
         #Map questions to dates and scores
         questions_to_date = self._get_questions_to_date_score(last_n_days)
-        rows = ''
-        #Add each row to html document
+        rendered = {}
         for i, (question, q_dates_scores) in enumerate(questions_to_date.items()):
-            #print(question)
-            #Set alternating color for the row
-            if i%2 == 0:
-                row_style = '<tr style="background-color:#eeeeee">'
+            #This question's row of the question x date grid, None where there is no score
+            q_scores = tuple(q_dates_scores.get(date) for date in date_list)
+            #A row's HTML only depends on its color, question and scores, so unchanged rows are not formatted again
+            key = (i % 2, question, q_scores)
+            row = self._row_html.get(key)
+            if row is None:
+                row = self._format_table_row(i, question, q_scores)
+            rendered[key] = row
+            yield row
+        self._row_html = rendered
+
+    def _format_table_row(self, i, question, q_scores):
+        """
+        Formats the HTML row of the i-th question from its scores on each date of the table
+        """
+        min_score = min(self._score_range)
+        blank_cell = '<td>{:2}</td>'.format('')
+        #Set alternating color for the row
+        if i%2 == 0:
+            row_style = '<tr style="background-color:#eeeeee">'
+        else:
+            row_style = '<tr>'
+        row = [row_style, '<th scope="row" style="text-align: right">{}</th>'.format(question)]
+        q_present = [q_score for q_score in q_scores if q_score is not None]
+        q_total = sum(q_present)
+        q_hasValueCount = len(q_present)
+        #For every date in the last n days
+        for q_score in q_scores:
+            if q_score is not None:
+                score_color = '#ff9900' if q_score == min_score else 'black'
+                if self._print_only_decimals:
+                    score_dec = q_score-int(q_score)
+                    if score_dec > 0:
+                        q_score = str(score_dec)[1:]
+                row.append('<td style="color: {};"><p>{:2}</p></td>'.format(score_color, q_score))
             else:
-                row_style = '<tr>'
-            rows += row_style+'<th scope="row" style="text-align: right">{}</th>'.format(question)
-            q_dates, q_scores = zip(*q_dates_scores)
-            q_total = 0
-            q_hasValueCount = 0
-            #For every date in the last n days
-            for date in date_list:
-                #If date is found in the list of dates for this question
-                if date in q_dates:
-                    #Get this question's score
-                    q_score = q_scores[q_dates.index(date)]
-                    q_total += q_score
-                    score_color = '#ff9900' if q_score == min(self._score_range) else 'black'
-                    if self._print_only_decimals:
-                        score_dec = q_score-int(q_score)
-                        if score_dec > 0:
-                            q_score = str(score_dec)[1:]
-                    rows += '<td style="color: {};"><p>{:2}</p></td>'.format(score_color, q_score)
-                    q_hasValueCount += 1
-                else:
-                    #Add a blank score
-                    rows += '<td>{:2}</td>'.format('')
-
-            #Get the smiley based on this question's total score
-            q_smiley, score, color = self._get_question_smiley(q_total, q_hasValueCount)
-            rows += '<td style="color: {};">{:3}</td><td>{:3}</td></tr>'.format(color, score, q_smiley)
+                #Add a blank score
+                row.append(blank_cell)
 
-        return rows
+        #Get the smiley based on this question's total score
+        q_smiley, score, color = self._get_question_smiley(q_total, q_hasValueCount)
+        row.append('<td style="color: {};">{:3}</td><td>{:3}</td></tr>'.format(color, score, q_smiley))
+        return ''.join(row)
 
-    def table_last_n_days(self):
+    @_instrumented_chunks
+    def iter_table_last_n_days(self):
         """
-        Generates a table that shows the score of each question in the last n_days.
-        Returns an HTML representation and simple text table.
+        Yields the HTML of table_last_n_days in chunks, for writing to a file or HTTP response as it is rendered.
         """
-        html_table = '<table style="font-family:arial,sans-serif;border-collapse:collapse;table-layout: fixed;">'
+        yield '<table style="font-family:arial,sans-serif;border-collapse:collapse;table-layout: fixed;">'
 
         #Create day headers
         date_list = self._get_date_list()
@@ -309,13 +1429,22 @@ class DailyQuestions:
 
         #Create month headers
         cols, month_header = self._get_html_month_headers(month_to_days)
-        html_table += cols + month_header + day_header
+        yield cols + month_header + day_header
 
         #Create question rows
         last_n_days = self._get_last_n_days()
-        table_rows = self._get_table_rows(last_n_days, date_list)
+        yield from self._iter_table_rows(last_n_days, date_list)
+
+        yield '</table>'
 
-        return html_table + table_rows + '</table>'
+    @_instrumented(count=None)
+    @_cached_report
+    def table_last_n_days(self):
+        """
+        Generates a table that shows the score of each question in the last n_days.
+        Returns an HTML representation and simple text table.
+        """
+        return ''.join(self.iter_table_last_n_days())
 
     def _get_month_calendar_and_delta(self, date):
         month_calendar = calendar.monthcalendar(date.year, date.month)
@@ -328,63 +1457,64 @@ class DailyQuestions:
 
         return month_calendar, calendar_delta
 
-    def _format_month_calendar(self, month, scores, max_length):
+    def _iter_month_calendar(self, month, scores, max_length):
         """
             Format month and list o scores into a html table or txt block
         """
         #Start HTML and Txt headers
-        month_table = """
+        yield """
                       <table>
                       <tr>
                         <th colspan="7" style="text-align: center;" >{}</th>
                       </tr>
                       """.format(month)
         txt_week_header = calendar.weekheader(max_length)
-        week_header = '<tr>'+''.join(['<td>{}</td>'.format(week) for week in txt_week_header.split(' ')])+'</tr>'
+        yield '<tr>'+''.join(['<td>{}</td>'.format(week) for week in txt_week_header.split(' ')])+'</tr>'
+
+        upper_score = max(self._score_range)
+        lower_score = min(self._score_range)
+        scale_range = max(self._scale) - min(self._scale)
+        bad_score_limit =  max(self._scale) // 2
+        good_score_limit =  bad_score_limit + (max(self._scale) // 4 )
+        empty_cell = '<td>{:{w}}</td>'.format('-', w=max_length)
+        outside_cell = '<td>{:{w}}</td>'.format(' ', w=max_length)
 
-        week_scores = '<tr>'
+        week_scores = ['<tr>']
         for i, day in enumerate(scores):
             score, q_count = day
             score_color = 'black'
             #Color day as a 'bad' day if the added sum of the scores on that day is less or equal to
             #half the possible sum, detemrined by the number of questions on that day
-            upper_bound = q_count * max(self._score_range)
-            lower_bound = q_count * min(self._score_range)
+            upper_bound = q_count * upper_score
+            lower_bound = q_count * lower_score
             if upper_bound != 0:
-                scalar = (max(self._scale) - min(self._scale)) / (upper_bound - lower_bound)
+                scalar = scale_range / (upper_bound - lower_bound)
                 score = int((score-lower_bound) * scalar)
 
-                bad_score_limit =  max(self._scale) // 2
-                good_score_limit =  bad_score_limit + (max(self._scale) // 4 )
-
                 if score <= bad_score_limit:
                     score_color =  '#ff9900'
                 elif score >= good_score_limit:
                     score_color =  '#00AF00'
-                else:
-                    'black'
 
             if i%7 == 0 and i != -0:
-                week_scores += '</tr><tr>'
+                week_scores.append('</tr><tr>')
 
             if score > 0:
-                week_scores += '<td style="color: {};">{:{w}}</td>'.format(score_color, score, w=max_length)
+                week_scores.append('<td style="color: {};">{:{w}}</td>'.format(score_color, score, w=max_length))
             elif score == 0:
-                week_scores += '<td>{:{w}}</td>'.format('-', w=max_length)
+                week_scores.append(empty_cell)
             else:
-                week_scores += '<td>{:{w}}</td>'.format(' ', w=max_length)
-
-        week_scores += '</tr>'
-        html = month_table+week_header+week_scores+'</table>'
+                week_scores.append(outside_cell)
 
-        return html
+        week_scores.append('</tr></table>')
+        yield ''.join(week_scores)
 
-    def table_last_n_months(self):
+    @_instrumented_chunks
+    def iter_table_last_n_months(self):
         """
-        Generates a calendar that shows the added scores  of each day in the last n_months.
-        Returns an HTML representation and simple text blocks.
+        Yields the HTML of table_last_n_months in chunks, one month calendar at a time.
         """
-        months = self._get_last_n_months()
+        months = list(self._get_last_n_months())
         if not months:
             return
 
@@ -412,77 +1542,321 @@ class DailyQuestions:
         #Save last month
         months_to_scores[month_key] = month_calendar
 
-        #Format months into html tables and blocks of text
-        html_months = ''
+        #Format months into html tables and blocks of text, past months are usually unchanged since the last render
+        rendered = {}
         for month, scores in months_to_scores.items():
-            html = self._format_month_calendar(month, scores, len(str(max_score)))
-            html_months += html
-
-        return html_months
+            key = (month, len(str(max_score)), tuple(tuple(day) for day in scores))
+            block = self._month_html.get(key)
+            if block is None:
+                block = ''.join(self._iter_month_calendar(month, scores, len(str(max_score))))
+            rendered[key] = block
+            yield block
+        self._month_html = rendered
+
+    @_instrumented(count=None)
+    @_cached_report
+    def table_last_n_months(self):
+        """
+        Generates a calendar that shows the added scores  of each day in the last n_months.
+        Returns an HTML representation and simple text blocks.
+        """
+        return ''.join(self.iter_table_last_n_months())
 
+    @_instrumented()
     def _score_by_day(self):
-        result = self._cur.execute("SELECT strftime('%w',date) as week , AVG(score) as score "+
-                                   "FROM daily_question GROUP BY week")
+        if self._columns is not None:
+            result = self._columns.score_by_weekday(self._get_month_cut_date().toordinal())
+        else:
+            result = self._cur.execute("SELECT weekday, SUM(score_sum) * 1.0 / SUM(row_count) as score "+
+                                       "FROM weekday_rollup WHERE year * 100 + month >= ? GROUP BY weekday",
+                                       (self._get_month_key(),))
         return [(calendar.day_name[int(row[0])], row[1] if max(self._score_range) >= 10 else row[1]*2) for row in result]
 
+    @_instrumented(count=lambda result: len(result[0]))
     def _score_by_question(self):
-        result = self._cur.execute("SELECT question, AVG(score) as score, LENGTH(question) as qlen "+
-                                   "FROM daily_question GROUP BY question ORDER BY qlen DESC")
+        if self._columns is not None:
+            result = self._columns.score_by_question(self._get_month_cut_date().toordinal())
+        else:
+            result = self._cur.execute("SELECT text, SUM(score_sum) * 1.0 / SUM(row_count) as score, "+
+                                       "LENGTH(text) as qlen FROM question_rollup "+
+                                       "JOIN question ON question.id = question_id "+
+                                       "WHERE year * 100 + month >= ? GROUP BY question_id ORDER BY qlen DESC, text",
+                                       (self._get_month_key(),))
         result = [(row[0], row[1] if max(self._score_range) >= 10 else row[1]*2) for row in result]
-        qlen = self._cur.execute("SELECT  MAX(LENGTH(question)) as qlen FROM daily_question")
-        return result, qlen.fetchone()[0]
+        qlen = max([len(question) for question, _ in result] or [None])
+        return result, qlen
 
-    def get_statistics(self):
+    @_instrumented_chunks
+    def iter_statistics(self):
+        """
+        Yields the HTML of get_statistics in chunks, one table at a time.
+        """
         score_by_day = self._score_by_day()
         score_max = max(self._score_range)
         score_max = score_max if score_max >= 10 else score_max * 2
-        score_min= min(self._score_range)
+        width = len(str(score_max))
+        row = '<tr><td>{}</td><td style="text-align: left">|{:<{w}}o</td></tr>'
 
         #Create headers for html and text tables
-        html_report = '<table>'
-        table_header = ('<tr><th colspan="2" style="text-align: left">'+
-                        'Score by weekday - last {} month(s)</th></tr>').format(self.n_months+1)
-        html_report += table_header
+        html_report = ['<table>', ('<tr><th colspan="2" style="text-align: left">'+
+                                   'Score by weekday - last {} month(s)</th></tr>').format(self.n_months+1)]
 
         #Add each score and day
         for day, score in score_by_day:
-            html_report += ('<tr><td>{}</td><td style="text-align: left">|{:<{w}}o'+
-                            '</td></tr>').format(day, '-'*int(score*self._score_multiplier), w=len(str(score_max)))
-        html_report += '</table><table>'
+            html_report.append(row.format(day, '-'*int(score*self._score_multiplier), w=width))
+        html_report.append('</table>')
+        yield ''.join(html_report)
 
         score_by_question, qlen = self._score_by_question()
-        html_report += ('<tr><th colspan="2" style="text-align: left">'+
-                        'Score by question - last {} month(s)</th></tr>').format(self.n_months+1)
+        html_report = ['<table>', ('<tr><th colspan="2" style="text-align: left">'+
+                                   'Score by question - last {} month(s)</th></tr>').format(self.n_months+1)]
         for question, score in score_by_question:
-            html_report += ('<tr><td>{}</td><td style="text-align: left">|{:<{w}}o'+
-                            '</td></tr>').format(question, '-'*int(score*self._score_multiplier), w=len(str(score_max)))
-        html_report += '</table>'
-
-        return html_report
-
-    def _prepare_data_frame_last_n_months(self):
-        values = self._get_last_n_months()
-        value_list = []
-        for year, month, day, score, q_count in values:
-            upper_bound = q_count * max(self._score_range)
-            lower_bound = q_count * min(self._score_range)
-            if upper_bound != 0:
-                scalar = (max(self._scale) - min(self._scale)) / (upper_bound - lower_bound)
-                score = int((score-lower_bound) * scalar)
-            value_list.append((datetime(year, month, day), score, q_count))
-        return value_list
-
-    def display_last_n_months_line_chart(self):
-        d = pd.DataFrame(self._prepare_data_frame_last_n_months(), columns=['date','score','q_count'])
-        fig, ax = plt.subplots()
-        ax.plot(d['date'], d['score'])
-        ax.set_ylim([min(self._scale),max(self._scale)*1.1])
-        fig.autofmt_xdate()
-        fig.set_size_inches(15,3)
-
-        # calc the trendline
-        date_to_x = [x for x in range(0, len(d['date']))]
-        z = np.polyfit(date_to_x, d['score'], 1)
-        p = np.poly1d(z)
-        ax.plot(d['date'],p(date_to_x),"r--")
-        return ax
+            html_report.append(row.format(question, '-'*int(score*self._score_multiplier), w=width))
+        html_report.append('</table>')
+        yield ''.join(html_report)
+
+    @_instrumented(count=None)
+    @_cached_report
+    def get_statistics(self):
+        return ''.join(self.iter_statistics())
+
+    def iter_report(self):
+        """
+        Yields the day table, month calendars and statistics in chunks
+        """
+        yield from self.iter_table_last_n_days()
+        yield from self.iter_table_last_n_months()
+        yield from self.iter_statistics()
+
+    #Counts the characters written, which are its bytes unless questions are not ASCII
+    @_instrumented(count=None, size=lambda written: written)
+    def write_report(self, fp):
+        """
+        Streams the day table, month calendars and statistics to a writable text file object.
+        returns number of characters written
+        """
+        written = 0
+        for chunk in self.iter_report():
+            fp.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _get_daily_totals(self, start, end):
+        """
+        Score sums and row counts of every day from start to end inclusive, 0 on days without rows
+        """
+        length = (end - start).days + 1
+        if length <= 0:
+            return [], []
+        if self._columns is not None:
+            sums, counts = self._columns.daily_totals(start.toordinal(), end.toordinal())
+            return sums.tolist(), counts.tolist()
+
+        sums, counts = [0] * length, [0] * length
+        result = self._cur.execute("SELECT date, score_sum, row_count FROM daily_rollup WHERE date >= ? AND date <= ?",
+                                   (start.isoformat(), end.isoformat()))
+        for day, score_sum, row_count in result:
+            sums[(day - start).days] = score_sum
+            counts[(day - start).days] = row_count
+        return sums, counts
+
+    @_instrumented()
+    def get_daily_scores(self, start, end):
+        """
+        Returns (date, score sum, rows logged) of every day with rows from start to end inclusive.
+        Any range of the loaded rows can be queried, see the since argument of loadContent.
+        """
+        sums, counts = self._get_daily_totals(start, end)
+        return [(start + timedelta(days=i), _to_number(sums[i]), counts[i]) for i in range(len(sums)) if counts[i]]
+
+    @_instrumented()
+    def get_rolling_average(self, n_days, start, end):
+        """
+        Returns (date, average score) of every day from start to end inclusive, averaging the rows logged
+        in the n_days ending on that day, None when there are none. Windows are differences of prefix sums,
+        so the cost is one pass over the days whatever n_days is.
+        """
+        if n_days < 1:
+            raise ValueError("n_days must be at least 1")
+        first = start - timedelta(days=n_days - 1)
+        sums, counts = self._get_daily_totals(first, end)
+        sum_prefix = [0] + list(accumulate(sums))
+        count_prefix = [0] + list(accumulate(counts))
+        rows = []
+        for i in range(n_days, len(sum_prefix)):
+            count = count_prefix[i] - count_prefix[i - n_days]
+            score = sum_prefix[i] - sum_prefix[i - n_days]
+            rows.append((first + timedelta(days=i - 1), score / count if count else None))
+        return rows
+
+    @_instrumented()
+    def get_question_trends(self, start, end):
+        """
+        Returns (question, rows logged, average score, slope) of every question logged from start to end inclusive,
+        the slope being the least squares change of its score per day. Ordered by question length and text.
+        """
+        if self._columns is not None:
+            result = self._columns.question_sums(start.toordinal(), end.toordinal())
+        else:
+            result = self._cur.execute("SELECT text, COUNT(*), TOTAL(score), TOTAL(x), TOTAL(x * x), TOTAL(x * score), "+
+                                       "LENGTH(text) as qlen FROM (SELECT question_id, score, "+
+                                       "julianday(date) - julianday(?) as x FROM daily_question "+
+                                       "WHERE date >= ? AND date <= ?) JOIN question ON question.id = question_id "+
+                                       "GROUP BY question_id ORDER BY qlen DESC, text",
+                                       (start.isoformat(), start.isoformat(), end.isoformat()))
+        trends = []
+        for question, n, score_sum, x_sum, x_squared_sum, xy_sum in (row[:6] for row in result):
+            denominator = n * x_squared_sum - x_sum * x_sum
+            slope = (n * xy_sum - x_sum * score_sum) / denominator if denominator else 0.0
+            trends.append((question, n, score_sum / n, slope))
+        return trends
+
+    def _get_chart_renderer(self):
+        if self._chart_renderer is None:
+            from report_charts import ChartRenderer
+            self._chart_renderer = ChartRenderer()
+        return self._chart_renderer
+
+    def _get_chart_series(self):
+        """
+        Day ordinals and daily scores of the month view scaled to the scale, as NumPy arrays
+        """
+        import numpy as np
+        rows = list(self._get_last_n_months())
+        days = np.array([date(year, month, day).toordinal() for year, month, day, _, _ in rows], np.int64)
+        scores = np.array([row[3] for row in rows], np.float64)
+        q_counts = np.array([row[4] for row in rows], np.float64)
+        upper_bound = q_counts * max(self._score_range)
+        lower_bound = q_counts * min(self._score_range)
+        scaled = upper_bound != 0
+        span = max(self._scale) - min(self._scale)
+        scores[scaled] = np.trunc((scores[scaled] - lower_bound[scaled]) * span /
+                                  (upper_bound[scaled] - lower_bound[scaled]))
+        return days, scores
+
+    def _get_question_series(self):
+        """
+        (question, day ordinals, scores scaled to the scale) of every question in the month view
+        """
+        import numpy as np
+        series = DefaultListOrderedDict()
+        for question, sdate, score, _ in self._get_question_days(self._get_month_cut_date(), datetime.today().date()):
+            series[question].append((sdate.toordinal(), _to_score(score)))
+        low, high = min(self._score_range), max(self._score_range)
+        scalar = (max(self._scale) - min(self._scale)) / (high - low)
+        return [(question, np.array([day for day, _ in values], np.int64),
+                 np.array([(score - low) * scalar + min(self._scale) for _, score in values]))
+                for question, values in series.items()]
+
+    def _get_chart_ylim(self):
+        return [min(self._scale), max(self._scale) * 1.1]
+
+    @_instrumented(count=lambda ax: len(ax.lines[0].get_xdata()))
+    def display_last_n_months_line_chart(self, downsample='lttb'):
+        """
+        Draws the daily score of the month view and its trend line, downsampled to the chart width
+        with 'lttb', 'minmax' or None. The figure is reused by the next call.
+        returns the matplotlib axes
+        """
+        days, scores = self._get_chart_series()
+        return self._get_chart_renderer().line_chart(days, scores, self._get_chart_ylim(), downsample)
+
+    @_instrumented(count=None, size=len)
+    def render_last_n_months_chart(self, format='png', downsample='lttb'):
+        """
+        returns display_last_n_months_line_chart as PNG, SVG or other matplotlib format bytes
+        """
+        ax = self.display_last_n_months_line_chart(downsample)
+        return self._get_chart_renderer().to_bytes(ax.figure, format)
+
+    @_instrumented(count=None, size=len)
+    def render_question_charts(self, format='png', n_cols=4, downsample='lttb'):
+        """
+        Draws one small chart per question of its daily scores in the month view, all in one figure.
+        returns the figure as PNG, SVG or other matplotlib format bytes
+        """
+        renderer = self._get_chart_renderer()
+        figure = renderer.small_multiples(self._get_question_series(), self._get_chart_ylim(), n_cols, downsample)
+        return renderer.to_bytes(figure, format)
+
+def main(argv=None):
+    """
+    Command line entry point:
+        python -m daily_questions report log.txt --days 20 --months 3 --out report.html
+        python -m daily_questions report log.txt --out report.html --watch
+        python -m daily_questions batch logs/ --out reports/
+    """
+    parser = argparse.ArgumentParser(prog='daily_questions', description='Daily questions HTML reports')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    report = commands.add_parser('report', help='render the report of one log')
+    report.add_argument('log_file', help="log file, or - to read the log from stdin")
+    report.add_argument('--days', type=int, default=10, help='number of days in the day view')
+    report.add_argument('--months', type=int, default=2, help='number of months in the month view')
+    report.add_argument('--out', default='-', help='file the HTML report is written to, stdout by default')
+    report.add_argument('--db-path', default=None, help='persistent store for incremental loads')
+    report.add_argument('--backend', choices=('sqlite', 'numpy'), default='sqlite', help='in-memory row store')
+    report.add_argument('--snapshot-dir', default=None, help='memory mapped history for the numpy backend')
+    report.add_argument('--print-only-decimals', action='store_true')
+    report.add_argument('--censor-questions', action='store_true')
+    report.add_argument('--chart', default=None, help='file the month chart is written to, .png or .svg')
+    report.add_argument('--watch', action='store_true',
+                        help='follow the log and rewrite --out whenever lines are appended, until interrupted')
+    report.add_argument('--stats', action='store_true', help='print the time, rows and bytes of each stage to stderr')
+    report.add_argument('--metrics', default=None, help='file the stage stats are written to in Prometheus format')
+    report.add_argument('--profile', default=None, help='file a cProfile dump of the stages is written to')
+    commands.add_parser('batch', add_help=False, help='render the reports of many logs, see batch_reports.py')
+    args, extra = parser.parse_known_args(argv)
+
+    if args.command == 'batch':
+        import batch_reports
+        return batch_reports.main(extra)
+    if extra:
+        parser.error('unrecognized arguments: {}'.format(' '.join(extra)))
+    if args.watch and (args.log_file == '-' or args.out == '-'):
+        parser.error('--watch needs a log file and an --out file')
+
+    #A Path, as a str is taken for log text unless it ends in .txt
+    dq = DailyQuestions(sys.stdin if args.log_file == '-' else Path(args.log_file),
+                        n_days=args.days, n_months=args.months, db_path=args.db_path, backend=args.backend,
+                        snapshot_dir=args.snapshot_dir,
+                        print_only_decimals=args.print_only_decimals,
+                        censor_questions=args.censor_questions,
+                        instrument=args.stats or args.metrics is not None, profile=args.profile is not None)
+    if args.watch:
+        def write_update(dq, row_count, insert_count):
+            #Replace the report in one step so a browser refreshing it never reads half a report
+            with open(args.out + '.tmp', 'w') as out:
+                dq.write_report(out)
+            os.replace(args.out + '.tmp', args.out)
+            print('{} rows added, {} updated'.format(insert_count, args.out), file=sys.stderr)
+        try:
+            dq.watch(write_update)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    dq.loadContent()
+    if args.out == '-':
+        dq.write_report(sys.stdout)
+    else:
+        with open(args.out, 'w') as out:
+            dq.write_report(out)
+    if args.chart is not None:
+        with open(args.chart, 'wb') as chart:
+            chart.write(dq.render_last_n_months_chart(os.path.splitext(args.chart)[1][1:] or 'png'))
+
+    if args.stats:
+        print('{:<36} {:>6} {:>10} {:>10} {:>10}'.format('stage', 'calls', 'seconds', 'rows', 'bytes'),
+              file=sys.stderr)
+        for stage, stats in dq.stats().items():
+            print('{:<36} {:>6} {:>10.4f} {:>10} {:>10}'.format(stage, *stats), file=sys.stderr)
+    if args.metrics is not None:
+        with open(args.metrics, 'w') as metrics:
+            metrics.write(dq.prometheus_text())
+    if args.profile is not None:
+        dq.dump_profile(args.profile)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Line charts of daily questions scores, drawn straight from NumPy arrays on reusable Agg figures.
+
+Long series are downsampled to the pixel width of the chart before drawing, with either
+Largest-Triangle-Three-Buckets, which keeps the visual shape, or min/max bucketing, which keeps
+every extreme. Figures are created once per chart shape and their lines updated on later calls,
+and are rendered without pyplot, so charts can be exported to PNG or SVG bytes in headless jobs.
+Used by DailyQuestions.display_last_n_months_line_chart and its render_*_chart methods.
+"""
+import io
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+#Day ordinal of 1970-01-01, the epoch of datetime64
+EPOCH_ORDINAL = 719163
+
+def lttb(x, y, n_out):
+    """
+    Indices of the n_out points Largest-Triangle-Three-Buckets keeps, always the first and the last.
+    Each bucket keeps the point forming the largest triangle with the point kept before it and the mean
+    of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, np.float64)
+    y = np.asarray(y, np.float64)
+    #n_out - 2 buckets between the first and the last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    index = np.empty(n_out, np.int64)
+    index[0], index[-1] = 0, n - 1
+    kept = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[kept] - next_x) * (y[start:end] - y[kept]) -
+                      (x[kept] - x[start:end]) * (next_y - y[kept]))
+        kept = start + int(np.argmax(area))
+        index[i + 1] = kept
+    return index
+
+def min_max(y, n_out):
+    """
+    Indices of the minimum and maximum of n_out // 2 equal buckets, in series order
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    index = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        index.extend((start + int(np.argmin(y[start:end])), start + int(np.argmax(y[start:end]))))
+    return np.unique(index)
+
+DOWNSAMPLERS = {
+    'lttb': lambda x, y, n_out: lttb(x, y, n_out),
+    'minmax': lambda x, y, n_out: min_max(y, n_out),
+    None: lambda x, y, n_out: np.arange(len(x)),
+}
+
+def downsample(x, y, n_out, method='lttb'):
+    """
+    Returns x and y reduced to about n_out points with method 'lttb', 'minmax' or None to keep every point
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError("downsample must be one of 'lttb', 'minmax' or None, not {!r}".format(method))
+    index = DOWNSAMPLERS[method](x, y, n_out)
+    return np.asarray(x)[index], np.asarray(y)[index]
+
+def trend_line(x, y):
+    """
+    Slope and intercept of the least squares line through x and y, from their sums in one pass
+    """
+    x = np.asarray(x, np.float64)
+    y = np.asarray(y, np.float64)
+    n = len(x)
+    if n < 2:
+        return 0.0, float(y.mean()) if n else 0.0
+    x_sum, y_sum = x.sum(), y.sum()
+    denominator = n * (x * x).sum() - x_sum * x_sum
+    slope = (n * (x * y).sum() - x_sum * y_sum) / denominator if denominator else 0.0
+    return slope, (y_sum - slope * x_sum) / n
+
+def to_dates(days):
+    """
+    Converts day ordinals to datetime64 days, which matplotlib plots as dates
+    """
+    return (np.asarray(days, np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+
+class ChartRenderer:
+    """
+    Draws score series on Agg figures kept between calls, one per chart kind and shape.
+    A figure returned by one call is redrawn by the next call of the same kind and shape.
+    """
+
+    def __init__(self, width=15, height=3, dpi=100):
+        """
+        Args:   width, height - size of a line chart in inches, small multiples scale the height by row
+                dpi - dots per inch, width * dpi is the number of points a series is downsampled to
+        """
+        self._width = width
+        self._height = height
+        self._dpi = dpi
+        self._figures = {}
+
+    def _get_figure(self, key, n_rows, n_cols):
+        """
+        Returns the figure and its grid of axes for key, creating them on first use
+        """
+        if key not in self._figures:
+            figure = Figure(figsize=(self._width, self._height * n_rows), dpi=self._dpi)
+            FigureCanvasAgg(figure)
+            axes = figure.subplots(n_rows, n_cols, squeeze=False).ravel()
+            for ax in axes:
+                #The lines start empty, so the date axis is not inferred from their data
+                ax.xaxis_date()
+            lines = [(ax.plot([], [])[0], ax.plot([], [], 'r--')[0]) for ax in axes]
+            self._figures[key] = figure, axes, lines
+        return self._figures[key]
+
+    def _draw(self, ax, lines, days, scores, ylim, n_out, method, title=None):
+        """
+        Updates the score and trend lines of one axes in place
+        """
+        score_line, trend = lines
+        x, y = downsample(days, scores, n_out, method)
+        score_line.set_data(to_dates(x), y)
+        if len(days):
+            slope, intercept = trend_line(days, scores)
+            ends = np.array([days[0], days[-1]])
+            trend.set_data(to_dates(ends), slope * ends + intercept)
+        else:
+            trend.set_data([], [])
+        ax.relim()
+        ax.autoscale_view(scaley=False)
+        ax.set_ylim(ylim)
+        if title is not None:
+            ax.set_title(title, fontsize='small')
+
+    def line_chart(self, days, scores, ylim, downsample='lttb'):
+        """
+        Draws scores by day ordinal with their trend line.
+        returns the axes
+        """
+        figure, axes, lines = self._get_figure('line', 1, 1)
+        self._draw(axes[0], lines[0], days, scores, ylim, int(self._width * self._dpi), downsample)
+        figure.autofmt_xdate()
+        return axes[0]
+
+    def small_multiples(self, series, ylim, n_cols=4, downsample='lttb'):
+        """
+        Draws one chart per (title, days, scores) of series on a grid of n_cols columns sharing ylim.
+        returns the figure
+        """
+        n_rows = max(1, -(-len(series) // n_cols))
+        figure, axes, lines = self._get_figure(('small_multiples', n_rows, n_cols), n_rows, n_cols)
+        n_out = int(self._width * self._dpi / n_cols)
+        for i, ax in enumerate(axes):
+            ax.set_visible(i < len(series))
+            if i < len(series):
+                title, days, scores = series[i]
+                self._draw(ax, lines[i], days, scores, ylim, n_out, downsample, title)
+        figure.autofmt_xdate()
+        return figure
+
+    @staticmethod
+    def to_bytes(figure, format='png'):
+        """
+        Renders a figure to PNG, SVG or any other format matplotlib writes, returns the bytes
+        """
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=format)
+        return buffer.getvalue()
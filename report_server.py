@@ -0,0 +1,173 @@
+# Copyright (c) 2018 Sergio Lira <sergio.lira@gmail.com>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+"""
+Serves daily questions reports over HTTP from a directory of on-disk stores.
+
+    python report_server.py stores/ [--port 8000] [--threads 8]
+
+Each <name>.db in the directory is a store written by DailyQuestions(db_path=...), for instance by
+batch_reports.py --db-dir stores/ or python -m daily_questions report log.txt --db-path stores/name.db.
+Reports are served at
+
+    /<name>/days        table_last_n_days
+    /<name>/months      table_last_n_months
+    /<name>/statistics  get_statistics
+    /<name>/report      all three
+
+with optional ?days=N&months=N query parameters. Stores are opened read-only through a pool of
+connections per store and reports are rendered on a thread pool, so a slow render never blocks
+the event loop serving other requests.
+"""
+import argparse
+import asyncio
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from daily_questions import DailyQuestions
+
+REPORTS = {
+    'days': lambda dq: dq.table_last_n_days(),
+    'months': lambda dq: dq.table_last_n_months(),
+    'statistics': lambda dq: dq.get_statistics(),
+    'report': lambda dq: dq.table_last_n_days() + dq.table_last_n_months() + dq.get_statistics(),
+}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ConnectionPool:
+    """
+    A fixed number of read-only DailyQuestions over one store, each used by one thread at a time
+    """
+    def __init__(self, db_path, size, **options):
+        self._pool = queue.Queue()
+        for _ in range(size):
+            self._pool.put(DailyQuestions(None, db_path=db_path, read_only=True, **options))
+
+    @contextmanager
+    def acquire(self):
+        dq = self._pool.get()
+        try:
+            yield dq
+        finally:
+            self._pool.put(dq)
+
+class ReportServer:
+
+    def __init__(self, store_dir, threads=8, pool_size=None, **options):
+        """
+        Args:   store_dir - directory of <name>.db stores
+                threads - number of report rendering threads
+                pool_size - read-only connections per store, defaults to threads
+                options - passed on to every DailyQuestions, e.g. print_only_decimals
+        """
+        self._store_dir = store_dir
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._pool_size = pool_size or threads
+        self._options = options
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+    def _get_pool(self, name):
+        db_path = os.path.join(self._store_dir, name + '.db')
+        if os.sep in name or name.startswith('.') or not os.path.isfile(db_path):
+            raise HTTPError(404, 'no store named {}'.format(name))
+        with self._pools_lock:
+            if name not in self._pools:
+                self._pools[name] = ConnectionPool(db_path, self._pool_size, **self._options)
+            return self._pools[name]
+
+    def render(self, name, report, n_days, n_months):
+        """
+        Renders one report of a store, runs on the thread pool
+        """
+        with self._get_pool(name).acquire() as dq:
+            dq.set_window(n_days, n_months)
+            return REPORTS[report](dq)
+
+    def _parse_target(self, target):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        if len(parts) != 2 or parts[1] not in REPORTS:
+            raise HTTPError(404, 'expected /<store>/{}'.format('|'.join(sorted(REPORTS))))
+        query = parse_qs(url.query)
+        try:
+            n_days = int(query.get('days', ['10'])[0])
+            n_months = int(query.get('months', ['2'])[0])
+        except ValueError:
+            raise HTTPError(400, 'days and months must be integers')
+        return parts[0], parts[1], n_days, n_months
+
+    async def handle(self, reader, writer):
+        status, body = 200, ''
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            #Drain the headers, requests have no body
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request_line) != 3:
+                raise HTTPError(400, 'malformed request line')
+            method, target, _ = request_line
+            if method != 'GET':
+                raise HTTPError(405, 'only GET is supported')
+            name, report, n_days, n_months = self._parse_target(target)
+            loop = asyncio.get_event_loop()
+            body = await loop.run_in_executor(self._executor, self.render, name, report, n_days, n_months)
+        except HTTPError as e:
+            status, body = e.status, str(e)
+        except Exception as e:
+            status, body = 500, '{}: {}'.format(type(e).__name__, e)
+
+        payload = body.encode('utf-8')
+        content_type = 'text/html' if status == 200 else 'text/plain'
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: {}; charset=utf-8\r\nContent-Length: {}\r\n'
+                     'Connection: close\r\n\r\n'.format(status, REASONS[status], content_type,
+                                                        len(payload)).encode('latin-1'))
+        writer.write(payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def serve_forever(self, host='127.0.0.1', port=8000):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = loop.run_until_complete(asyncio.start_server(self.handle, host, port))
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+            self._executor.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('store_dir', help='directory of <name>.db stores')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--threads', type=int, default=8, help='report rendering threads')
+    parser.add_argument('--print-only-decimals', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = ReportServer(args.store_dir, threads=args.threads, print_only_decimals=args.print_only_decimals)
+    print('Serving {} on http://{}:{}/'.format(args.store_dir, args.host, args.port))
+    try:
+        server.serve_forever(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())